@@ -1 +1 @@
-from . import users, courses, lessons, assignments, students, enrollments, groups, attendance, grades, assignment_submit, student_code 
\ No newline at end of file
+from . import users, courses, lessons, assignments, students, enrollments, groups, attendance, grades, assignment_submit, student_code, imports 
\ No newline at end of file
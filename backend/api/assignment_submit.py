@@ -1,8 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict, Any
-from models.assignment_submit import AssignmentSubmit, AssignmentSubmitCreate
+from typing import List, Dict, Any, Optional
+from models.assignment_submit import AssignmentSubmit, AssignmentSubmitCreate, AssignmentSubmitBulk
+from bson import ObjectId
 from crud.assignment_submit_crud import assignment_submit_crud
 from auth.dependencies import get_current_user
+from api.pagination import Page, page_params
+from api.responses import trusted
+from crud.pagination import MAX_PAGE_SIZE
+from api.streaming import stream_format, streaming_response
 import logging
 
 # Настройка логирования
@@ -48,6 +53,34 @@ async def create_assignment_submit(
             detail=str(e)
         )
 
+@router.post("/lessons/{lesson_id}/submit", response_model=Dict[str, int])
+async def bulk_submit_lesson(
+    lesson_id: str,
+    bulk_data: AssignmentSubmitBulk,
+    current_user: dict = Depends(get_current_user)
+):
+    """Отмечает задания урока отправленными сразу для нескольких студентов"""
+    if not ObjectId.is_valid(lesson_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid lesson ID format"
+        )
+    try:
+        result = await assignment_submit_crud.bulk_submit(
+            lesson_id=lesson_id,
+            student_ids=bulk_data.student_ids,
+            is_submitted=bulk_data.is_submitted,
+            assignment_ids=bulk_data.assignment_ids
+        )
+        logger.info(f"Bulk submit for lesson {lesson_id}: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Error in bulk submit: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/students/{student_id}/assignments/{assignment_id}/submit", response_model=Dict[str, Any])
 async def get_student_assignment_submit(
     student_id: str,
@@ -80,11 +113,17 @@ async def get_student_assignment_submit(
 @router.get("/students/{student_id}/submits", response_model=List[Dict[str, Any]])
 async def get_student_submits(
     student_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    stream: Optional[str] = Depends(stream_format()),
     current_user: dict = Depends(get_current_user)
 ):
     """Получает все отправки заданий для конкретного студента"""
+    if stream:
+        return streaming_response(assignment_submit_crud.iter_submits({"student_id": student_id}), stream)
     try:
-        return await assignment_submit_crud.get_student_submits(student_id)
+        submits, next_cursor = await assignment_submit_crud.get_student_submits(student_id, page.after, page.limit)
+        page.set_next_cursor(next_cursor)
+        return trusted(submits, page.response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -94,11 +133,17 @@ async def get_student_submits(
 @router.get("/lessons/{lesson_id}/submits", response_model=List[Dict[str, Any]])
 async def get_lesson_submits(
     lesson_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    stream: Optional[str] = Depends(stream_format()),
     current_user: dict = Depends(get_current_user)
 ):
     """Получает все отправки заданий для конкретного урока"""
+    if stream:
+        return streaming_response(assignment_submit_crud.iter_submits({"lesson_id": lesson_id}), stream)
     try:
-        return await assignment_submit_crud.get_lesson_submits(lesson_id)
+        submits, next_cursor = await assignment_submit_crud.get_lesson_submits(lesson_id, page.after, page.limit)
+        page.set_next_cursor(next_cursor)
+        return trusted(submits, page.response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -108,11 +153,17 @@ async def get_lesson_submits(
 @router.get("/assignments/{assignment_id}/submits", response_model=List[Dict[str, Any]])
 async def get_assignment_submits(
     assignment_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    stream: Optional[str] = Depends(stream_format()),
     current_user: dict = Depends(get_current_user)
 ):
     """Получает все отправки для конкретного задания"""
+    if stream:
+        return streaming_response(assignment_submit_crud.iter_submits({"assignment_id": assignment_id}), stream)
     try:
-        return await assignment_submit_crud.get_assignment_submits(assignment_id)
+        submits, next_cursor = await assignment_submit_crud.get_assignment_submits(assignment_id, page.after, page.limit)
+        page.set_next_cursor(next_cursor)
+        return trusted(submits, page.response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
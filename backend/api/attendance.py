@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
-from models.attendance import AttendanceRecord, AttendanceStatus
+from models.attendance import AttendanceRecord, AttendanceStatus, AttendanceBulkRecord
 from crud.attendance_crud import attendance_crud
 from typing import List
 from .dependencies import get_current_user
@@ -20,6 +20,21 @@ async def record_attendance(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/{group_id}/lessons/{lesson_number}/record")
+async def record_lesson_attendance(
+    group_id: str,
+    lesson_number: int,
+    attendance: AttendanceBulkRecord,
+    current_user = Depends(get_current_user)
+):
+    """Посещаемость всей группы за занятие одним запросом"""
+    try:
+        return await attendance_crud.record_lesson_attendance(
+            group_id, lesson_number, attendance.records, attendance.date
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/group/{group_id}")
 async def get_group_attendance(
     group_id: str,
@@ -30,6 +45,18 @@ async def get_group_attendance(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/group/{group_id}/stats")
+async def get_group_attendance_stats(
+    group_id: str,
+    cache: bool = True,
+    current_user = Depends(get_current_user)
+):
+    """Матрица посещаемости и статистика группы, посчитанные на сервере"""
+    try:
+        return await attendance_crud.get_group_attendance_stats(group_id, use_cache=cache)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/student/{student_id}/group/{group_id}")
 async def get_student_attendance(
     student_id: str,
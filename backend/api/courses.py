@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from models.course import Course
-from crud.course_crud import course_crud
-from typing import List
+from crud.course_crud import course_crud, TREE_EXCLUDABLE_FIELDS
+from typing import List, Optional
 from .dependencies import get_current_user
+from .pagination import Page, page_params
+from .responses import trusted
+from crud.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/courses",
@@ -19,10 +22,11 @@ async def create_course(course: Course):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/")
-async def get_courses():
+async def get_courses(page: Page = Depends(page_params(MAX_PAGE_SIZE))):
     try:
-        courses = await course_crud.get_courses()
-        return courses
+        courses, next_cursor = await course_crud.get_courses(page.after, page.limit)
+        page.set_next_cursor(next_cursor)
+        return trusted(courses, page.response)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -36,6 +40,22 @@ async def get_course(course_id: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/{course_id}/tree")
+async def get_course_tree(course_id: str, exclude: Optional[str] = None):
+    """
+    Курс со всеми уроками и заданиями за один запрос.
+    exclude — список полей через запятую, например exclude=description,code_editor
+    """
+    exclude_fields = [field.strip() for field in exclude.split(",") if field.strip()] if exclude else []
+    unknown = set(exclude_fields) - TREE_EXCLUDABLE_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot exclude fields: {', '.join(sorted(unknown))}")
+
+    course = await course_crud.get_course_tree(course_id, exclude_fields)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return course
+
 @router.put("/{course_id}")
 async def update_course(course_id: str, course_data: dict):
     try:
@@ -5,6 +5,9 @@ from crud.student_crud import student_crud
 from crud.course_crud import course_crud
 from typing import List
 from auth.dependencies import get_current_user
+from api.pagination import Page, page_params
+from api.responses import trusted
+from crud.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/enrollments", tags=["enrollments"])
 
@@ -35,16 +38,22 @@ async def create_enrollment(
 @router.get("/student/{student_id}", response_model=List[Enrollment])
 async def get_student_enrollments(
     student_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
     current_user: dict = Depends(get_current_user)
 ):
-    return await enrollment_crud.get_student_enrollments(student_id)
+    enrollments, next_cursor = await enrollment_crud.get_student_enrollments(student_id, page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(enrollments, page.response)
 
 @router.get("/course/{course_id}", response_model=List[Enrollment])
 async def get_course_enrollments(
     course_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
     current_user: dict = Depends(get_current_user)
 ):
-    return await enrollment_crud.get_course_enrollments(course_id)
+    enrollments, next_cursor = await enrollment_crud.get_course_enrollments(course_id, page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(enrollments, page.response)
 
 @router.put("/{enrollment_id}", response_model=Enrollment)
 async def update_enrollment(
@@ -6,6 +6,9 @@ from crud.course_crud import course_crud
 from crud.student_crud import student_crud
 from crud.group_crud import group_crud
 from auth.dependencies import verify_token
+from api.pagination import Page, page_params
+from api.responses import trusted
+from crud.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api", tags=["grades"])
 
@@ -28,13 +31,19 @@ async def create_grade(grade: Grade, token: dict = Depends(verify_token)):
     return await grade_crud.create(grade)
 
 @router.get("/assignments/{assignment_id}/grades/", response_model=List[Grade])
-async def get_grades_by_assignment(assignment_id: str, token: dict = Depends(verify_token)):
+async def get_grades_by_assignment(
+    assignment_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    token: dict = Depends(verify_token)
+):
     # Проверяем существование задания
     assignment = await course_crud.get_assignment(assignment_id)
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    return await grade_crud.get_by_assignment(assignment_id)
+    grades, next_cursor = await grade_crud.get_by_assignment(assignment_id, page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(grades, page.response)
 
 @router.put("/assignments/grades/{grade_id}/", response_model=Grade)
 async def update_grade(grade_id: str, grade: Grade, token: dict = Depends(verify_token)):
@@ -75,25 +84,51 @@ async def delete_grade(grade_id: str, token: dict = Depends(verify_token)):
     return {"message": "Grade deleted successfully"}
 
 @router.get("/assignments/students/{student_id}/grades/", response_model=List[Grade])
-async def get_student_grades(student_id: str, token: dict = Depends(verify_token)):
+async def get_student_grades(
+    student_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    token: dict = Depends(verify_token)
+):
     # Проверяем существование студента
     student = await student_crud.get_user_by_id(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    return await grade_crud.get_by_student(student_id)
+    grades, next_cursor = await grade_crud.get_by_student(student_id, page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(grades, page.response)
 
 @router.get("/groups/{group_id}/grades/", response_model=List[Grade])
-async def get_group_grades(group_id: str, token: dict = Depends(verify_token)):
+async def get_group_grades(
+    group_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    token: dict = Depends(verify_token)
+):
     # Проверяем существование группы
     group = await group_crud.get_group(group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    # Получаем оценки для всех студентов группы
-    grades = []
-    for student in group.students:
-        student_grades = await grade_crud.get_by_student(student.student_id)
-        grades.extend(student_grades)
-    
-    return grades 
\ No newline at end of file
+    # Получаем оценки для всех студентов группы одним запросом
+    student_ids = [student.student_id for student in group.students]
+    grades, next_cursor = await grade_crud.get_by_students(student_ids, page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(grades, page.response)
+
+@router.get("/groups/{group_id}/gradebook/")
+async def get_group_gradebook(
+    group_id: str,
+    include_assignments: bool = False,
+    include_submits: bool = False,
+    token: dict = Depends(verify_token)
+):
+    """Журнал оценок группы: матрица студент × задание со средними баллами"""
+    group = await group_crud.get_group(group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    return await grade_crud.get_group_gradebook(
+        group,
+        include_assignments=include_assignments,
+        include_submits=include_submits
+    )
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from models.group import Group, GroupStudent, GroupUpdate
+from models.group import Group, GroupStudent, GroupStudentsBulk, GroupUpdate
 from crud.group_crud import group_crud
 from typing import List
 from .dependencies import get_current_user
+from .pagination import Page, page_params
+from .responses import trusted
 
 router = APIRouter(
     prefix="/groups",
@@ -17,9 +19,11 @@ async def create_group(group: Group, current_user = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=List[Group])
-async def get_groups(skip: int = 0, limit: int = 10, current_user = Depends(get_current_user)):
+async def get_groups(page: Page = Depends(page_params()), current_user = Depends(get_current_user)):
     try:
-        return await group_crud.get_groups(skip, limit)
+        groups, next_cursor = await group_crud.get_groups(page.after, page.limit)
+        page.set_next_cursor(next_cursor)
+        return trusted(groups, page.response)
     except Exception as e:
         print(f"Error in get_groups: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -59,6 +63,14 @@ async def add_student_to_group(group_id: str, student: GroupStudent, current_use
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/{group_id}/students/bulk")
+async def add_students_to_group(group_id: str, bulk: GroupStudentsBulk, current_user = Depends(get_current_user)):
+    """Добавляет набор студентов; по каждому возвращается added, duplicate, full или error"""
+    results = await group_crud.add_students_to_group(group_id, bulk.students)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return results
+
 @router.delete("/{group_id}/students/{student_id}")
 async def remove_student_from_group(group_id: str, student_id: str, current_user = Depends(get_current_user)):
     success = await group_crud.remove_student_from_group(group_id, student_id)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from crud.bulk_import import bulk_import_crud
+from crud.group_crud import group_crud
+from services.bulk_import import ImportFormatError, detect_format, run_import
+from auth.dependencies import get_current_user
+from typing import Optional
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+# Тело запроса — сам файл (Content-Type: text/csv, application/json или
+# application/x-ndjson), он читается потоком и не сохраняется целиком.
+# Ответ — отчёт: total, created, failed и ошибки по номерам строк.
+
+
+async def _run(request: Request, format: Optional[str], handler) -> dict:
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_import(request.stream(), fmt, handler)
+
+
+@router.post("/students")
+async def import_students(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Студенты: поля как у POST /students (username, first_name, last_name, email, phone, password)"""
+    return await _run(request, format, bulk_import_crud.import_students)
+
+
+@router.post("/enrollments")
+async def import_enrollments(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Зачисления: course_id и студент по student_id, student_email или student_username"""
+    return await _run(request, format, bulk_import_crud.import_enrollments)
+
+
+@router.post("/groups/{group_id}/students")
+async def import_group_students(
+    group_id: str,
+    request: Request,
+    format: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Состав группы: студент по student_id, student_email или student_username; status, balance — по желанию"""
+    if not await group_crud.get_group(group_id):
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    async def handler(rows):
+        return await bulk_import_crud.import_group_students(group_id, rows)
+
+    return await _run(request, format, handler)
@@ -0,0 +1,36 @@
+from fastapi import HTTPException, Query, Response
+from crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, decode_cursor
+from typing import Optional
+
+# Тело ответа остаётся массивом, курсор следующей страницы передаётся в заголовке
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page:
+    def __init__(self, response: Response, after: Optional[str], limit: int):
+        self.after = after
+        self.limit = min(limit, MAX_PAGE_SIZE)
+        self.response = response
+
+    def set_next_cursor(self, cursor: Optional[str]) -> None:
+        if cursor:
+            self.response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+def page_params(default_limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Параметры страницы списка: after — курсор из X-Next-Cursor предыдущего ответа,
+    limit — размер страницы (не больше PAGE_SIZE_MAX).
+    """
+    async def dependency(
+        response: Response,
+        after: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+        limit: int = Query(default_limit, ge=1, description=f"Не больше {MAX_PAGE_SIZE}")
+    ) -> Page:
+        if after:
+            try:
+                decode_cursor(after)
+            except InvalidCursor:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        return Page(response, after, limit)
+    return dependency
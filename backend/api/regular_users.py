@@ -3,6 +3,8 @@ from models.regular_user import RegularUser, RegularUserInDB, RegularUserUpdate
 from crud.regular_user_crud import regular_user_crud
 from typing import List
 from auth.dependencies import get_current_user
+from api.pagination import Page, page_params
+from api.responses import trusted
 
 router = APIRouter(prefix="/regular-users", tags=["regular-users"])
 
@@ -23,11 +25,12 @@ async def create_regular_user(
 
 @router.get("/", response_model=List[RegularUserInDB])
 async def get_regular_users(
-    skip: int = 0, 
-    limit: int = 10,
+    page: Page = Depends(page_params()),
     current_user: dict = Depends(get_current_user)
 ):
-    return await regular_user_crud.get_users(skip, limit)
+    items, next_cursor = await regular_user_crud.get_users(page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(items, page.response)
 
 @router.get("/{user_id}", response_model=RegularUserInDB)
 async def get_regular_user(
@@ -0,0 +1,63 @@
+"""
+Быстрая сериализация ответов.
+
+FastJSONResponse — ответ по умолчанию для всего приложения: orjson вместо json,
+ObjectId и datetime сериализуются без jsonable_encoder.
+
+trusted() — путь для данных, которые CRUD-слой уже собрал в модели: FastAPI
+не валидирует их повторно по response_model, модели сразу пишутся в JSON.
+response_model на маршруте остаётся для документации OpenAPI.
+"""
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from bson import ObjectId
+from functools import lru_cache
+from typing import Any, List, Optional
+import orjson
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        # Так же, как FastAPI сериализует response_model: по алиасам, в JSON-режиме
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def dumps(content: Any) -> bytes:
+    # Модели и однородные списки моделей пишет сериализатор pydantic (Rust) за один вызов
+    if isinstance(content, BaseModel):
+        return content.model_dump_json(by_alias=True).encode()
+    if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+        model = type(content[0])
+        if all(type(item) is model for item in content):
+            return _list_adapter(model).dump_json(content, by_alias=True)
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Отдаёт content без повторной валидации по response_model.
+    response — внедрённый в маршрут Response (например page.response): его
+    заголовки (X-Next-Cursor и т.п.) переносятся в ответ.
+    """
+    result = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        if response.status_code:
+            result.status_code = response.status_code
+        result.headers.raw.extend(response.headers.raw)
+    return result
@@ -0,0 +1,45 @@
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from .responses import dumps
+
+NDJSON = "ndjson"
+ARRAY = "array"
+
+
+def stream_format():
+    """
+    Включает потоковый ответ: ?stream=ndjson, ?stream=array
+    или заголовок Accept: application/x-ndjson. Без них ответ обычный.
+    """
+    async def dependency(
+        request: Request,
+        stream: Optional[str] = Query(None, description="ndjson или array — отдавать список потоком")
+    ) -> Optional[str]:
+        if stream is None and "application/x-ndjson" in request.headers.get("accept", ""):
+            return NDJSON
+        if stream not in (None, NDJSON, ARRAY):
+            raise HTTPException(status_code=400, detail="stream must be 'ndjson' or 'array'")
+        return stream
+    return dependency
+
+
+def streaming_response(docs: AsyncIterator[dict], fmt: str) -> StreamingResponse:
+    """
+    Сериализует документы по мере чтения курсора: в памяти держится только
+    текущая пачка курсора, первый байт уходит сразу после первого документа.
+    """
+    if fmt == NDJSON:
+        async def body():
+            async for doc in docs:
+                yield dumps(doc) + b"\n"
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    async def body():
+        yield b"["
+        separator = b""
+        async for doc in docs:
+            yield separator + dumps(doc)
+            separator = b","
+        yield b"]"
+    return StreamingResponse(body(), media_type="application/json")
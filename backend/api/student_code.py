@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from typing import Dict, Any, List, Optional
 from auth.dependencies import get_current_user
 from bson import ObjectId
 from .database import get_database
+from .pagination import Page, page_params
+from .responses import trusted
+from crud.pagination import MAX_PAGE_SIZE, STREAM_BATCH_SIZE, paginate
+from .streaming import NDJSON, stream_format, streaming_response
+from crud.code_revisions import CODE, SOURCES, code_revisions
+from crud.blobs import blob_store
+from fastapi.responses import PlainTextResponse
 import logging
 
 # Настройка логирования
@@ -38,6 +45,7 @@ async def get_student_code(
         # Преобразуем ObjectId в строку
         code_submission["id"] = str(code_submission["_id"])
         del code_submission["_id"]
+        await blob_store.load(code_submission, "code")
         
         # Добавляем флаг наличия отправки
         code_submission["has_submission"] = True
@@ -53,23 +61,106 @@ async def get_student_code(
 @router.get("/students/{student_id}/code-submissions", response_model=List[Dict[str, Any]])
 async def get_student_code_submissions(
     student_id: str,
+    page: Page = Depends(page_params(MAX_PAGE_SIZE)),
+    stream: Optional[str] = Depends(stream_format()),
     current_user: dict = Depends(get_current_user)
 ):
-    """Получает все отправки кода для конкретного студента"""
+    """
+    Получает отправки кода для конкретного студента (постранично или потоком).
+    Большой код в списке не передаётся: вместо него code_ref и code_size,
+    текст — через /blobs/{code_ref} или запрос кода по заданию.
+    """
+    db = get_database()
+    if stream:
+        async def submissions():
+            cursor = db.student_assignment_code_submit.find({"student_id": student_id}).sort("_id", 1)
+            async for submission in cursor.batch_size(STREAM_BATCH_SIZE):
+                submission["id"] = str(submission.pop("_id"))
+                yield submission
+        return streaming_response(submissions(), stream)
     try:
-        db = get_database()
-        cursor = db.student_assignment_code_submit.find({"student_id": student_id})
-        submissions = []
-        
-        async for submission in cursor:
+        submissions, next_cursor = await paginate(
+            db.student_assignment_code_submit, {"student_id": student_id}, page.after, page.limit
+        )
+        for submission in submissions:
             submission["id"] = str(submission["_id"])
             del submission["_id"]
-            submissions.append(submission)
-            
-        return submissions
+
+        page.set_next_cursor(next_cursor)
+        return trusted(submissions, page.response)
     except Exception as e:
         logger.error(f"Error getting student code submissions: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        ) 
\ No newline at end of file
+        )
+
+
+def _source(source: str = Query(CODE, description="code — автосохранения редактора, submit — код сдачи")) -> str:
+    if source not in SOURCES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="source must be 'code' or 'submit'")
+    return source
+
+@router.get("/students/{student_id}/assignments/{assignment_id}/revisions", response_model=List[Dict[str, Any]])
+async def get_code_revisions(
+    student_id: str,
+    assignment_id: str,
+    source: str = Depends(_source),
+    start: int = Query(1, ge=1),
+    end: Optional[int] = Query(None, ge=1),
+    stream: Optional[str] = Depends(stream_format()),
+    current_user: dict = Depends(get_current_user)
+):
+    """Индекс ревизий кода для просмотра истории: номер, время, размер (без самого кода)"""
+    revisions = code_revisions.get_index(student_id, assignment_id, source, start, end)
+    if stream:
+        return streaming_response(revisions, stream)
+    return trusted([revision async for revision in revisions])
+
+@router.get("/students/{student_id}/assignments/{assignment_id}/revisions/replay")
+async def replay_code_revisions(
+    student_id: str,
+    assignment_id: str,
+    source: str = Depends(_source),
+    start: int = Query(1, ge=1),
+    end: Optional[int] = Query(None, ge=1),
+    stream: Optional[str] = Depends(stream_format()),
+    current_user: dict = Depends(get_current_user)
+):
+    """Воспроизведение истории: ревизии start..end с полным кодом, потоком (по умолчанию NDJSON)"""
+    revisions = code_revisions.replay(student_id, assignment_id, source, start, end)
+    return streaming_response(revisions, stream or NDJSON)
+
+@router.get("/students/{student_id}/assignments/{assignment_id}/revisions/{rev}", response_model=Dict[str, Any])
+async def get_code_revision(
+    student_id: str,
+    assignment_id: str,
+    rev: int,
+    source: str = Depends(_source),
+    current_user: dict = Depends(get_current_user)
+):
+    """Код конкретной ревизии"""
+    revision = await code_revisions.get_revision(student_id, assignment_id, rev, source)
+    if not revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+    return trusted(revision)
+
+@router.get("/blobs/{ref}", response_class=PlainTextResponse)
+async def get_code_blob(
+    ref: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Текст кода по ссылке code_ref / code_editor_ref. Содержимое по хешу не меняется и кэшируется клиентом"""
+    text = await blob_store.get(ref)
+    if text is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blob not found"
+        )
+    return PlainTextResponse(text, headers={
+        "ETag": f'"{ref}"',
+        "Cache-Control": "private, max-age=31536000, immutable"
+    })
@@ -3,6 +3,8 @@ from models.student import Student, StudentInDB, StudentUpdate
 from crud.student_crud import student_crud
 from typing import List
 from auth.dependencies import get_current_user
+from api.pagination import Page, page_params
+from api.responses import trusted
 
 router = APIRouter(prefix="/students", tags=["students"])
 
@@ -23,11 +25,12 @@ async def create_student(
 
 @router.get("/", response_model=List[StudentInDB])
 async def get_students(
-    skip: int = 0, 
-    limit: int = 10,
+    page: Page = Depends(page_params()),
     current_user: dict = Depends(get_current_user)
 ):
-    return await student_crud.get_users(skip, limit)
+    items, next_cursor = await student_crud.get_users(page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(items, page.response)
 
 @router.get("/{student_id}", response_model=StudentInDB)
 async def get_student(
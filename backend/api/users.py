@@ -5,6 +5,8 @@ from typing import List
 from auth.dependencies import get_current_user
 from services import discord as webhook
 from auth.clerk import verify_token
+from api.pagination import Page, page_params
+from api.responses import trusted
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -16,16 +18,19 @@ async def create_user(
     existing_user = await user_crud.get_user_by_clerk_id(user.clerk_id)
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
+    created = await user_crud.create_user(user)
+    # Уведомление уходит в фоне, ответ не ждёт Discord
     await webhook.notify_discord(user)
-    return await user_crud.create_user(user)
+    return created
 
 @router.get("/", response_model=List[User])
 async def get_users(
-    skip: int = 0, 
-    limit: int = 10,
+    page: Page = Depends(page_params()),
     current_user: dict = Depends(get_current_user)
 ):
-    return await user_crud.get_users(skip, limit)
+    items, next_cursor = await user_crud.get_users(page.after, page.limit)
+    page.set_next_cursor(next_cursor)
+    return trusted(items, page.response)
 
 @router.get("/{clerk_id}", response_model=User)
 async def get_user(
@@ -1,42 +1,25 @@
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jwt.algorithms import RSAAlgorithm
 import jwt
-import requests
 import os
 from datetime import datetime
+from .jwks import jwks_store
+from .token_cache import token_cache
 
 
 security = HTTPBearer()
 
-def get_clerk_public_keys():
-    try:
-        response = requests.get(os.getenv("CLERK_JWKS_URL"))
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=500, 
-                detail="Failed to fetch Clerk public keys"
-            )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Error fetching Clerk public keys: {str(e)}"
-        )
-
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
     token = credentials.credentials
-    
+
+    # Повторный запрос с тем же токеном не требует RSA-проверки
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
-        jwks = get_clerk_public_keys()
         unverified_header = jwt.get_unverified_header(token)
-        
-        rsa_key = None
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = RSAAlgorithm.from_jwk(key)
-                break
+        rsa_key = await jwks_store.get_key(unverified_header.get("kid"))
 
         if rsa_key is None:
             raise HTTPException(
@@ -62,8 +45,11 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
                 detail="Invalid authorized party"
             )
 
+        token_cache.set(token, decoded_token)
         return decoded_token
 
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=401, 
@@ -0,0 +1,139 @@
+from fastapi import HTTPException
+from jwt.algorithms import RSAAlgorithm
+from typing import Any, Dict, Optional
+import asyncio
+import httpx
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Время жизни кэша ключей и запас, за который начинаем фоновое обновление (в секундах)
+JWKS_CACHE_TTL = int(os.getenv("CLERK_JWKS_TTL", "3600"))
+JWKS_REFRESH_MARGIN = int(os.getenv("CLERK_JWKS_REFRESH_MARGIN", "300"))
+# Минимальный интервал между повторными запросами при неизвестном kid
+JWKS_MIN_REFETCH_INTERVAL = int(os.getenv("CLERK_JWKS_MIN_REFETCH_INTERVAL", "30"))
+
+
+class JWKSKeyStore:
+    """
+    Процессный кэш публичных ключей Clerk.
+    Ключи загружаются асинхронно, хранятся уже разобранными по kid
+    и обновляются в фоне незадолго до истечения TTL.
+    """
+
+    def __init__(
+        self,
+        jwks_url: Optional[str] = None,
+        ttl: int = JWKS_CACHE_TTL,
+        refresh_margin: int = JWKS_REFRESH_MARGIN,
+        min_refetch_interval: int = JWKS_MIN_REFETCH_INTERVAL,
+        timeout: float = 5.0
+    ):
+        self._jwks_url = jwks_url
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl // 2)
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def jwks_url(self) -> Optional[str]:
+        # Читаем URL лениво, т.к. .env загружается уже после импорта модулей
+        return self._jwks_url or os.getenv("CLERK_JWKS_URL")
+
+    async def get_key(self, kid: str):
+        """Возвращает публичный ключ по kid или None, если такого ключа нет"""
+        now = time.monotonic()
+        if not self._keys or now >= self._expires_at:
+            await self.refresh()
+        elif now >= self._expires_at - self.refresh_margin and now - self._fetched_at >= self.min_refetch_interval:
+            self._schedule_refresh()
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._fetched_at >= self.min_refetch_interval:
+            # Возможно, Clerk ротировал ключи — перезапрашиваем JWKS один раз
+            await self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    async def refresh(self) -> None:
+        """Загружает JWKS заново; параллельные вызовы делят одну загрузку"""
+        seen_fetch = self._fetched_at
+        async with self._lock:
+            if self._fetched_at != seen_fetch:
+                # Пока ждали блокировку, ключи уже обновила другая корутина
+                return
+            try:
+                await self._fetch()
+            except Exception as e:
+                if not self._keys:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Error fetching Clerk public keys: {str(e)}"
+                    )
+                # Продолжаем работать со старыми ключами и не долбим Clerk запросами
+                # до следующей попытки не раньше чем через min_refetch_interval
+                logger.warning(f"Failed to refresh Clerk JWKS, using cached keys: {e}")
+                now = time.monotonic()
+                self._fetched_at = now
+                self._expires_at = max(self._expires_at, now + self.min_refetch_interval)
+
+    async def _fetch(self) -> None:
+        if not self.jwks_url:
+            raise RuntimeError("CLERK_JWKS_URL is not set")
+
+        response = await self._get_client().get(self.jwks_url)
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to fetch Clerk public keys: HTTP {response.status_code}")
+
+        keys = {}
+        for jwk in response.json().get("keys", []):
+            if jwk.get("kid") and jwk.get("kty") == "RSA":
+                keys[jwk["kid"]] = RSAAlgorithm.from_jwk(jwk)
+
+        now = time.monotonic()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + self.ttl
+        logger.info(f"Loaded {len(keys)} Clerk public keys")
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Background JWKS refresh failed: {e}")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def start(self) -> None:
+        """Прогревает кэш при старте приложения"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Не роняем старт: ключи догрузятся при первом запросе
+            logger.warning(f"Could not prefetch Clerk JWKS: {e}")
+
+    async def close(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+jwks_store = JWKSKeyStore()
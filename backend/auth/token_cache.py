@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import os
+import threading
+import time
+
+# Максимальное число токенов в кэше и верхняя граница времени жизни записи (в секундах)
+TOKEN_CACHE_SIZE = int(os.getenv("CLERK_TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_MAX_TTL = int(os.getenv("CLERK_TOKEN_CACHE_MAX_TTL", "300"))
+
+
+class VerifiedTokenCache:
+    """
+    LRU-кэш уже проверенных JWT.
+    Запись живёт до exp токена (но не дольше max_ttl), ключом служит
+    SHA-256 от токена, чтобы не держать сами токены в памяти.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, max_ttl: int = TOKEN_CACHE_MAX_TTL):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Возвращает payload токена, если он уже проверялся и ещё не истёк"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, payload = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(payload)
+
+    def set(self, token: str, payload: dict) -> None:
+        """Сохраняет payload проверенного токена до его exp"""
+        now = time.time()
+        expires_at = min(payload.get("exp", now), now + self.max_ttl)
+        if expires_at <= now or self.maxsize <= 0:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+token_cache = VerifiedTokenCache()
@@ -0,0 +1,117 @@
+"""
+Стоимость проверки Clerk-токена на запрос.
+
+Поднимает локальный JWKS-сервер с только что сгенерированным RSA-ключом,
+подписывает им токены и вызывает verify_token так, как его вызывает
+зависимость get_current_user:
+
+    uncached — кэш проверенных токенов отключён: RS256-проверка на каждый запрос
+    cached   — auth/token_cache.py: повторный токен проверяется один раз
+
+JWKS в обоих вариантах уже загружен (auth/jwks.py), поэтому разница — ровно
+RSA-проверка и разбор claims. --tokens задаёт число разных сессий: админка
+шлёт один и тот же токен на десятки запросов страницы.
+
+    python bench_auth.py --requests 2000 --tokens 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+from jwt.algorithms import RSAAlgorithm
+
+from auth.clerk import verify_token
+from auth.jwks import jwks_store
+from auth.token_cache import token_cache
+
+ISSUER = "https://clerk.bench.local"
+AUDIENCE = "http://localhost:5173"
+KID = "bench-key"
+
+
+def start_jwks_server(public_jwk: dict) -> tuple:
+    """JWKS-сервер на случайном порту; возвращает (сервер, счётчик запросов)"""
+    fetches = [0]
+    body = json.dumps({"keys": [public_jwk]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            fetches[0] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fetches
+
+
+def make_tokens(private_key, count: int) -> list:
+    exp = int(time.time()) + 3600
+    return [
+        jwt.encode(
+            {"iss": ISSUER, "azp": AUDIENCE, "sub": f"user_{i}", "exp": exp, "iat": int(time.time())},
+            private_key,
+            algorithm="RS256",
+            headers={"kid": KID}
+        )
+        for i in range(count)
+    ]
+
+
+async def measure(tokens: list, requests: int) -> float:
+    credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=token) for token in tokens]
+    started = time.perf_counter()
+    for i in range(requests):
+        await verify_token(credentials[i % len(credentials)])
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+async def main(args):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk["kid"] = KID
+    server, fetches = start_jwks_server(public_jwk)
+    os.environ["CLERK_JWKS_URL"] = f"http://127.0.0.1:{server.server_port}/jwks"
+    os.environ["CLERK_ISSUER"] = ISSUER
+    os.environ["CLERK_AUDIENCE"] = AUDIENCE
+
+    tokens = make_tokens(private_key, args.tokens)
+    try:
+        await jwks_store.start()
+        print(f"Запросов: {args.requests}, разных токенов: {args.tokens}")
+
+        maxsize = token_cache.maxsize
+        token_cache.maxsize = 0
+        token_cache.clear()
+        uncached = await measure(tokens, args.requests)
+        print(f"uncached  {uncached:8.1f} мкс на запрос")
+
+        token_cache.maxsize = maxsize
+        token_cache.clear()
+        cached = await measure(tokens, args.requests)
+        stats = token_cache.stats()
+        print(f"cached    {cached:8.1f} мкс на запрос  ({uncached / cached:.0f}x, "
+              f"попаданий {stats['hits']}, промахов {stats['misses']})")
+        print(f"Загрузок JWKS: {fetches[0]}")
+    finally:
+        await jwks_store.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Стоимость verify_token на запрос: без кэша / с кэшем токенов")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=1, help="сколько разных токенов (сессий) чередуется")
+    asyncio.run(main(parser.parse_args()))
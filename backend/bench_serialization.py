@@ -0,0 +1,145 @@
+"""
+Сравнение стоимости сериализации списков.
+
+Собирает те же модели, что возвращает CRUD-слой (группы, оценки, курсы), и
+прогоняет их через три варианта ответа внутри процесса, без базы и сети:
+
+    json     — как было: response_model + стандартный JSONResponse
+    orjson   — response_model + FastJSONResponse
+    trusted  — trusted(): без повторной валидации, сразу orjson
+
+Печатает процессорное время на запрос.
+
+    python bench_serialization.py --items 100 --requests 300
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from api.responses import FastJSONResponse, trusted
+from models.course import Course
+from models.grade import Grade
+from models.group import Group, GroupStudent
+
+
+def make_groups(count: int) -> List[Group]:
+    return [
+        Group(
+            _id=ObjectId(),
+            name=f"Poland PY Regular {i} (SAT-10)",
+            min_age=10,
+            max_age=14,
+            lesson_duration=90,
+            language="ru",
+            funnel="EU | Poland",
+            start_date=datetime.utcnow(),
+            timezone="Europe/Warsaw",
+            course_id=str(ObjectId()),
+            students=[
+                GroupStudent(
+                    student_id=str(ObjectId()),
+                    first_name="Иван",
+                    last_name=f"Петров {j}",
+                    email=f"student{i}_{j}@example.com",
+                    progress={"module_1": 80, "module_2": 40}
+                )
+                for j in range(14)
+            ],
+            students_count=14
+        )
+        for i in range(count)
+    ]
+
+
+def make_grades(count: int) -> List[Grade]:
+    return [
+        Grade(_id=str(ObjectId()), assignment_id=str(ObjectId()), student_id=str(ObjectId()), grade=i % 11)
+        for i in range(count)
+    ]
+
+
+def make_courses(count: int) -> List[Course]:
+    return [
+        Course(id=str(ObjectId()), title=f"Python {i}", description="Основы Python" * 10, duration=3.5, price=100.0)
+        for i in range(count)
+    ]
+
+
+def _route(items: list, wrap=None):
+    # Данные берём из замыкания: параметр со значением по умолчанию FastAPI счёл бы query-параметром
+    async def endpoint():
+        return wrap(items) if wrap else items
+    return endpoint
+
+
+def build_app(datasets: dict) -> FastAPI:
+    app = FastAPI()
+    for name, (model, items) in datasets.items():
+        # model=None — маршрут без response_model, как /courses: FastAPI гонит данные через jsonable_encoder
+        response_model = List[model] if model else None
+        app.add_api_route(f"/json/{name}", _route(items), response_model=response_model, response_class=JSONResponse)
+        app.add_api_route(f"/orjson/{name}", _route(items), response_model=response_model, response_class=FastJSONResponse)
+        app.add_api_route(f"/trusted/{name}", _route(items, trusted), response_model=response_model)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """Один GET прямо в ASGI-приложение, без HTTP-клиента: меряем только серверную часть"""
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("bench", 80), "client": ("127.0.0.1", 0),
+    }
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path}: HTTP {message['status']}")
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple:
+    size = len(await call(app, path))
+    started = time.process_time()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.process_time() - started) / requests * 1000, size
+
+
+async def main(args):
+    datasets = {
+        "groups": (Group, make_groups(args.items)),
+        "grades": (Grade, make_grades(args.items)),
+        "courses": (None, make_courses(args.items)),
+    }
+    app = build_app(datasets)
+    print(f"Элементов в списке: {args.items}, запросов на вариант: {args.requests}")
+    for name in datasets:
+        results = {}
+        for mode in ("json", "orjson", "trusted"):
+            results[mode] = await measure(app, f"/{mode}/{name}", args.requests)
+        baseline = results["json"][0]
+        line = "  ".join(
+            f"{mode}={cpu:.2f} мс ({baseline / cpu:.1f}x)" for mode, (cpu, _) in results.items()
+        )
+        print(f"{name:<8} {results['json'][1] // 1024} КБ  {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU на сериализацию списков: json / orjson / trusted")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -1,18 +1,23 @@
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 from models.assignment_submit import AssignmentSubmit, AssignmentSubmitCreate
-from .database import get_database
+from .database import BaseCRUD
+from .code_revisions import code_revisions, SUBMIT
+from .blobs import blob_store
+from .pagination import paginate, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE
 import logging
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class AssignmentSubmitCRUD:
-    def __init__(self):
-        self.db = get_database()
-        self.collection = self.db.student_assignment_submit
+class AssignmentSubmitCRUD(BaseCRUD):
+    @property
+    def collection(self):
+        return self.db.student_assignment_submit
 
     async def create_submit(
         self,
@@ -21,37 +26,89 @@ class AssignmentSubmitCRUD:
         assignment_id: str,
         submit_data: AssignmentSubmitCreate
     ) -> Optional[dict]:
-        """Создает новую отправку задания"""
-        try:
-            # Проверяем, существует ли уже отправка
-            existing = await self.get_student_assignment_submit(student_id, assignment_id)
-            if existing:
-                # Если существует, обновляем её
-                return await self.update_submit(existing["id"], submit_data)
-
-            submit_dict = {
-                "student_id": student_id,
+        """
+        Создает отправку задания или обновляет существующую.
+        Один атомарный upsert по уникальному индексу (student_id, assignment_id).
+        """
+        now = datetime.utcnow()
+        code = submit_data.code or ""
+        code_fields, unset_fields = await blob_store.fields("code", code)
+        query = {"student_id": student_id, "assignment_id": assignment_id}
+        update = {
+            "$set": {
                 "lesson_id": lesson_id,
-                "assignment_id": assignment_id,
                 "is_submitted": submit_data.is_submitted,
-                "code": submit_data.code or "",
-                "submit_date": submit_data.submit_date or datetime.utcnow(),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-
-            result = await self.collection.insert_one(submit_dict)
-            # Получаем полный документ после вставки
-            created_submit = await self.collection.find_one({"_id": result.inserted_id})
-            if created_submit:
-                created_submit["id"] = str(created_submit["_id"])
-                del created_submit["_id"]
-                return created_submit
-            return None
+                **code_fields,
+                "submit_date": submit_data.submit_date or now,
+                "updated_at": now
+            },
+            "$unset": unset_fields,
+            "$setOnInsert": {"created_at": now}
+        }
+        try:
+            try:
+                submit = await self.collection.find_one_and_update(
+                    query, update, upsert=True, return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                # Параллельный upsert успел вставить документ — повторяем как обычное обновление
+                submit = await self.collection.find_one_and_update(
+                    query, update, return_document=ReturnDocument.AFTER
+                )
+            if submit:
+                submit["id"] = str(submit.pop("_id"))
+                submit.pop("code_ref", None)
+                submit.pop("code_size", None)
+                submit["code"] = code
+                await code_revisions.record(student_id, assignment_id, code, SUBMIT, now)
+            return submit
         except Exception as e:
             print(f"Error in create_submit: {str(e)}")
             raise
 
+    async def bulk_submit(
+        self,
+        lesson_id: str,
+        student_ids: List[str],
+        is_submitted: bool = True,
+        assignment_ids: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Отмечает задания урока отправленными (или нет) сразу для нескольких студентов.
+        Если assignment_ids не переданы, берутся все задания урока. Код не меняется.
+        """
+        if assignment_ids is None:
+            cursor = self.db.assignments.find({"lesson_id": ObjectId(lesson_id)}, {"_id": 1})
+            assignment_ids = [str(assignment["_id"]) async for assignment in cursor]
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"student_id": student_id, "assignment_id": assignment_id},
+                {
+                    "$set": {
+                        "lesson_id": lesson_id,
+                        "is_submitted": is_submitted,
+                        "submit_date": now,
+                        "updated_at": now
+                    },
+                    "$setOnInsert": {"code": "", "created_at": now}
+                },
+                upsert=True
+            )
+            for student_id in dict.fromkeys(student_ids)
+            for assignment_id in dict.fromkeys(assignment_ids)
+        ]
+        if not operations:
+            return {"matched": 0, "modified": 0, "upserted": 0}
+
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return {
+            "matched": result.matched_count,
+            "modified": result.modified_count,
+            "upserted": result.upserted_count
+        }
+
     async def get_student_assignment_submit(
         self,
         student_id: str,
@@ -66,53 +123,42 @@ class AssignmentSubmitCRUD:
             if submit:
                 submit["id"] = str(submit["_id"])
                 del submit["_id"]
-                return submit
+                return await blob_store.load(submit, "code")
             return None
         except Exception as e:
             print(f"Error in get_student_assignment_submit: {str(e)}")
             raise
 
-    async def get_student_submits(self, student_id: str) -> List[dict]:
-        """Получает все отправки заданий для конкретного студента"""
-        try:
-            cursor = self.collection.find({"student_id": student_id})
-            submits = []
-            async for submit in cursor:
-                submit["id"] = str(submit["_id"])
-                del submit["_id"]
-                submits.append(submit)
-            return submits
-        except Exception as e:
-            print(f"Error in get_student_submits: {str(e)}")
-            raise
+    async def get_student_submits(
+        self, student_id: str, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Получает отправки заданий для конкретного студента (постранично)"""
+        return await self._get_page({"student_id": student_id}, after, limit)
 
-    async def get_lesson_submits(self, lesson_id: str) -> List[dict]:
-        """Получает все отправки заданий для конкретного урока"""
-        try:
-            cursor = self.collection.find({"lesson_id": lesson_id})
-            submits = []
-            async for submit in cursor:
-                submit["id"] = str(submit["_id"])
-                del submit["_id"]
-                submits.append(submit)
-            return submits
-        except Exception as e:
-            print(f"Error in get_lesson_submits: {str(e)}")
-            raise
+    async def get_lesson_submits(
+        self, lesson_id: str, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Получает отправки заданий для конкретного урока (постранично)"""
+        return await self._get_page({"lesson_id": lesson_id}, after, limit)
 
-    async def get_assignment_submits(self, assignment_id: str) -> List[dict]:
-        """Получает все отправки для конкретного задания"""
-        try:
-            cursor = self.collection.find({"assignment_id": assignment_id})
-            submits = []
-            async for submit in cursor:
-                submit["id"] = str(submit["_id"])
-                del submit["_id"]
-                submits.append(submit)
-            return submits
-        except Exception as e:
-            print(f"Error in get_assignment_submits: {str(e)}")
-            raise
+    async def get_assignment_submits(
+        self, assignment_id: str, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Получает отправки для конкретного задания (постранично)"""
+        return await self._get_page({"assignment_id": assignment_id}, after, limit)
+
+    async def iter_submits(self, query: dict) -> AsyncIterator[dict]:
+        """Отдаёт отправки по одной прямо из курсора, не собирая список в памяти"""
+        cursor = self.collection.find(query).sort("_id", 1).batch_size(STREAM_BATCH_SIZE)
+        async for submit in cursor:
+            submit["id"] = str(submit.pop("_id"))
+            yield submit
+
+    async def _get_page(self, query: dict, after: Optional[str], limit: int) -> Tuple[List[dict], Optional[str]]:
+        submits, next_cursor = await paginate(self.collection, query, after, limit)
+        for submit in submits:
+            submit["id"] = str(submit.pop("_id"))
+        return submits, next_cursor
 
     async def update_submit(
         self,
@@ -121,13 +167,16 @@ class AssignmentSubmitCRUD:
     ) -> Optional[dict]:
         """Обновляет существующую отправку задания"""
         try:
+            code = submit_data.code or ""
+            code_fields, unset_fields = await blob_store.fields("code", code)
             update_data = {
                 "$set": {
                     "is_submitted": submit_data.is_submitted,
-                    "code": submit_data.code or "",
+                    **code_fields,
                     "submit_date": submit_data.submit_date or datetime.utcnow(),
                     "updated_at": datetime.utcnow()
-                }
+                },
+                "$unset": unset_fields
             }
             
             result = await self.collection.find_one_and_update(
@@ -139,6 +188,10 @@ class AssignmentSubmitCRUD:
             if result:
                 result["id"] = str(result["_id"])
                 del result["_id"]
+                result.pop("code_ref", None)
+                result.pop("code_size", None)
+                result["code"] = code
+                await code_revisions.record(result["student_id"], result["assignment_id"], code, SUBMIT)
                 return result
             return None
         except Exception as e:
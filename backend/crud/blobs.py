@@ -0,0 +1,171 @@
+# Общий с student portal модуль: после правки обновите копию — python sync_shared.py
+"""
+Хранилище больших текстов (код студентов, шаблоны заданий) по хешу содержимого.
+
+Тексты не короче CODE_BLOB_MIN_SIZE символов хранятся в коллекции code_blobs:
+_id — sha256 текста, data — текст, сжатый zlib. В документе вместо текста
+остаются ссылка <поле>_ref и длина <поле>_size. Одинаковые тексты (шаблон
+задания и нетронутый код студента, одинаковые решения) хранятся один раз.
+Короткие тексты остаются в документе, как раньше.
+
+Списки отдают ссылку без текста, текст подгружается только там, где он нужен
+(load / load_many). Блоб неизменяем, поэтому прочитанные тексты кэшируются в
+памяти процесса без инвалидации. Блобы, на которые больше никто не ссылается,
+удаляет python -m migrations.move_code_to_blobs --gc.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .database import get_database
+import hashlib
+import logging
+import os
+import zlib
+
+logger = logging.getLogger(__name__)
+
+CODE_BLOB_MIN_SIZE = int(os.getenv("CODE_BLOB_MIN_SIZE", "1024"))
+# Объём распакованных текстов в памяти процесса
+CODE_BLOB_CACHE_BYTES = int(os.getenv("CODE_BLOB_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Поля с кодом: коллекция -> поле
+BLOB_FIELDS = {
+    "assignments": "code_editor",
+    "student_assignment_code_submit": "code",
+    "student_assignment_submit": "code",
+}
+
+
+def blob_ref(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class BlobStore:
+    def __init__(
+        self,
+        get_db: Callable,
+        min_size: int = CODE_BLOB_MIN_SIZE,
+        cache_bytes: int = CODE_BLOB_CACHE_BYTES
+    ):
+        self._get_db = get_db
+        self.min_size = min_size
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_bytes = 0
+
+    @property
+    def collection(self):
+        return self._get_db().code_blobs
+
+    async def put_many(self, texts: Iterable[str]) -> List[str]:
+        """Сохраняет тексты (одинаковые — один раз) и возвращает их ссылки"""
+        texts = list(texts)
+        refs = [blob_ref(text) for text in texts]
+        # Пишем всегда, даже если текст уже в кэше: блоб мог удалить сборщик мусора
+        new = dict(zip(refs, texts))
+        if new:
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {"_id": ref},
+                    {
+                        "$setOnInsert": {
+                            "data": zlib.compress(text.encode(), 6),
+                            "codec": "zlib",
+                            "size": len(text.encode()),
+                            "created_at": now
+                        },
+                        # Сборщик мусора не трогает недавно использованные блобы
+                        "$set": {"used_at": now}
+                    },
+                    upsert=True
+                )
+                for ref, text in new.items()
+            ]
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Дубликат _id — тот же текст уже записал параллельный запрос
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            for ref, text in new.items():
+                self._remember(ref, text)
+        return refs
+
+    async def put(self, text: str) -> str:
+        return (await self.put_many([text]))[0]
+
+    def is_large(self, text: Optional[str]) -> bool:
+        return text is not None and len(text) >= self.min_size
+
+    async def fields(self, field: str, text: Optional[str]) -> Tuple[dict, dict]:
+        """$set и $unset для записи текста в поле документа: ссылка на блоб или сам текст"""
+        text = text or ""
+        if not self.is_large(text):
+            return {field: text}, {f"{field}_ref": "", f"{field}_size": ""}
+        return {f"{field}_ref": await self.put(text), f"{field}_size": len(text)}, {field: ""}
+
+    async def pack(self, doc: dict, field: str) -> dict:
+        """Заменяет текст в документе для вставки на ссылку, если он большой"""
+        if self.is_large(doc.get(field)):
+            text = doc.pop(field)
+            doc[f"{field}_ref"] = await self.put(text)
+            doc[f"{field}_size"] = len(text)
+        return doc
+
+    async def get_many(self, refs: Iterable[str]) -> Dict[str, str]:
+        """Тексты по ссылкам: из кэша процесса, остальные — одним $in-запросом"""
+        texts = {}
+        missing = []
+        for ref in set(refs):
+            text = self._cache.get(ref)
+            if text is None:
+                missing.append(ref)
+            else:
+                self._cache.move_to_end(ref)
+                texts[ref] = text
+        if missing:
+            async for blob in self.collection.find({"_id": {"$in": missing}}):
+                text = zlib.decompress(blob["data"]).decode()
+                texts[blob["_id"]] = text
+                self._remember(blob["_id"], text)
+        return texts
+
+    async def get(self, ref: str) -> Optional[str]:
+        return (await self.get_many([ref])).get(ref)
+
+    async def load_many(self, docs: List[dict], field: str) -> List[dict]:
+        """Подставляет тексты вместо ссылок <field>_ref в документах"""
+        ref_field, size_field = f"{field}_ref", f"{field}_size"
+        texts = await self.get_many(doc[ref_field] for doc in docs if doc.get(ref_field))
+        for doc in docs:
+            ref = doc.pop(ref_field, None)
+            doc.pop(size_field, None)
+            if ref:
+                if ref not in texts:
+                    logger.error(f"Code blob {ref} is missing")
+                doc[field] = texts.get(ref, "")
+        return docs
+
+    async def load(self, doc: Optional[dict], field: str) -> Optional[dict]:
+        if doc is not None:
+            await self.load_many([doc], field)
+        return doc
+
+    def _remember(self, ref: str, text: str) -> None:
+        size = len(text)
+        if size > self.cache_bytes:
+            return
+        if ref in self._cache:
+            self._cache.move_to_end(ref)
+            return
+        self._cache[ref] = text
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+
+blob_store = BlobStore(get_database)
@@ -0,0 +1,241 @@
+"""
+Пакетная запись импортируемых строк.
+
+Каждый метод получает пачку [(номер строки, словарь полей)] и возвращает
+результат по каждой строке: {"row", "result", "error"?}, где result —
+created/added, duplicate или error. Проверки делаются по всей пачке сразу
+($in-запросы), запись — одним неупорядоченным insert_many.
+"""
+from models.student import Student
+from models.enrollment import Enrollment
+from models.group import GroupStudent
+from .database import BaseCRUD
+from .course_crud import content_cache
+from .group_crud import group_crud
+from auth.passwords import password_hasher
+from bson import ObjectId
+from datetime import datetime
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import os
+
+# Стоимость bcrypt для импортируемых паролей. Портал пересчитает хеш
+# со стоимостью BCRYPT_ROUNDS при первом входе студента.
+IMPORT_BCRYPT_ROUNDS = int(os.getenv("IMPORT_BCRYPT_ROUNDS", "10"))
+
+Rows = List[Tuple[int, dict]]
+
+
+def _row(number: int, result: str, error: Optional[str] = None) -> dict:
+    row = {"row": number, "result": result}
+    if error:
+        row["error"] = error
+    return row
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def _object_ids(values) -> List[ObjectId]:
+    return [ObjectId(value) for value in values if value and ObjectId.is_valid(value)]
+
+
+class BulkImportCRUD(BaseCRUD):
+    async def _insert(self, collection, accepted: List[Tuple[int, dict]], duplicate_message: str) -> List[dict]:
+        """insert_many(ordered=False): ошибки приходят по индексам, остальные строки записываются"""
+        if not accepted:
+            return []
+        errors = {}
+        try:
+            await collection.insert_many([doc for _, doc in accepted], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                errors[error["index"]] = error
+        results = []
+        for position, (number, _) in enumerate(accepted):
+            error = errors.get(position)
+            if error is None:
+                results.append(_row(number, "created"))
+            elif error.get("code") == 11000:
+                results.append(_row(number, "duplicate", duplicate_message))
+            else:
+                results.append(_row(number, "error", error.get("errmsg", "write error")))
+        return results
+
+    async def _resolve_students(self, rows: Rows) -> Dict[str, dict]:
+        """
+        Находит студентов по student_id, student_email или student_username
+        одним запросом. Ключи результата: id, "email:<...>", "username:<...>".
+        """
+        ids = _object_ids(row.get("student_id") for _, row in rows)
+        emails = [row["student_email"] for _, row in rows if row.get("student_email")]
+        usernames = [row["student_username"] for _, row in rows if row.get("student_username")]
+        conditions = []
+        if ids:
+            conditions.append({"_id": {"$in": ids}})
+        if emails:
+            conditions.append({"email": {"$in": emails}})
+        if usernames:
+            conditions.append({"username": {"$in": usernames}})
+        if not conditions:
+            return {}
+
+        found = {}
+        projection = {"first_name": 1, "last_name": 1, "email": 1, "username": 1}
+        async for student in self.db.students.find({"$or": conditions}, projection):
+            student["id"] = str(student.pop("_id"))
+            found[student["id"]] = student
+            found[f"email:{student.get('email')}"] = student
+            found[f"username:{student.get('username')}"] = student
+        return found
+
+    @staticmethod
+    def _student_for(row: dict, students: Dict[str, dict]) -> Optional[dict]:
+        if row.get("student_id"):
+            return students.get(row["student_id"])
+        if row.get("student_email"):
+            return students.get(f"email:{row['student_email']}")
+        if row.get("student_username"):
+            return students.get(f"username:{row['student_username']}")
+        return None
+
+    async def import_students(self, rows: Rows) -> List[dict]:
+        results, valid = [], []
+        for number, row in rows:
+            try:
+                valid.append((number, Student(**row)))
+            except ValidationError as e:
+                results.append(_row(number, "error", _validation_message(e)))
+
+        # Занятые логины и email — одним запросом на пачку
+        taken_usernames, taken_emails = set(), set()
+        if valid:
+            cursor = self.db.students.find(
+                {"$or": [
+                    {"username": {"$in": [student.username for _, student in valid]}},
+                    {"email": {"$in": [student.email for _, student in valid]}}
+                ]},
+                {"username": 1, "email": 1}
+            )
+            async for existing in cursor:
+                taken_usernames.add(existing.get("username"))
+                taken_emails.add(existing.get("email"))
+
+        accepted = []
+        for number, student in valid:
+            if student.username in taken_usernames:
+                results.append(_row(number, "duplicate", "Username already taken"))
+            elif student.email in taken_emails:
+                results.append(_row(number, "duplicate", "Email already registered"))
+            else:
+                taken_usernames.add(student.username)
+                taken_emails.add(student.email)
+                accepted.append((number, student))
+
+        # Хеши считаются параллельно в пуле потоков password_hasher
+        hashes = await asyncio.gather(*(
+            password_hasher.hash(student.password, rounds=IMPORT_BCRYPT_ROUNDS) for _, student in accepted
+        ))
+        now = datetime.utcnow()
+        docs = [
+            (number, {
+                **student.model_dump(exclude={"password"}),
+                "hashed_password": hashed_password,
+                "created_at": now,
+                "updated_at": now
+            })
+            for (number, student), hashed_password in zip(accepted, hashes)
+        ]
+        results.extend(await self._insert(self.db.students, docs, "Username or email already registered"))
+        return results
+
+    async def import_enrollments(self, rows: Rows) -> List[dict]:
+        students = await self._resolve_students(rows)
+        course_ids = set()
+        cursor = self.db.courses.find({"_id": {"$in": _object_ids(row.get("course_id") for _, row in rows)}}, {"_id": 1})
+        async for course in cursor:
+            course_ids.add(str(course["_id"]))
+
+        results, valid = [], []
+        for number, row in rows:
+            student = self._student_for(row, students)
+            if not student:
+                results.append(_row(number, "error", "Student not found"))
+                continue
+            if row.get("course_id") not in course_ids:
+                results.append(_row(number, "error", "Course not found"))
+                continue
+            fields = {k: v for k, v in row.items() if k not in ("student_email", "student_username")}
+            try:
+                valid.append((number, Enrollment(**{**fields, "student_id": student["id"]})))
+            except ValidationError as e:
+                results.append(_row(number, "error", _validation_message(e)))
+
+        # Уже существующие зачисления: один запрос на пачку
+        enrolled = set()
+        if valid:
+            cursor = self.db.enrollments.find(
+                {
+                    "student_id": {"$in": list({e.student_id for _, e in valid})},
+                    "course_id": {"$in": list({e.course_id for _, e in valid})}
+                },
+                {"student_id": 1, "course_id": 1}
+            )
+            async for existing in cursor:
+                enrolled.add((existing["student_id"], existing["course_id"]))
+
+        now = datetime.utcnow()
+        docs = []
+        for number, enrollment in valid:
+            key = (enrollment.student_id, enrollment.course_id)
+            if key in enrolled:
+                results.append(_row(number, "duplicate", "Student is already enrolled in this course"))
+                continue
+            enrolled.add(key)
+            docs.append((number, {
+                **enrollment.model_dump(exclude={"id"}),
+                "created_at": now,
+                "updated_at": now
+            }))
+
+        inserted = await self._insert(self.db.enrollments, docs, "Student is already enrolled in this course")
+        results.extend(inserted)
+        created = {row["row"] for row in inserted if row["result"] == "created"}
+        student_ids = {doc["student_id"] for number, doc in docs if number in created}
+        if student_ids:
+            await content_cache.bump(*(f"enrollments:{student_id}" for student_id in student_ids))
+        return results
+
+    async def import_group_students(self, group_id: str, rows: Rows) -> List[dict]:
+        students = await self._resolve_students(rows)
+        results, members = [], []
+        for number, row in rows:
+            student = self._student_for(row, students)
+            if not student:
+                results.append(_row(number, "error", "Student not found"))
+                continue
+            extra = {k: v for k, v in row.items() if k in ("balance", "total_points", "status")}
+            try:
+                members.append((number, GroupStudent(
+                    student_id=student["id"],
+                    first_name=student.get("first_name", ""),
+                    last_name=student.get("last_name", ""),
+                    email=student.get("email"),
+                    **extra
+                )))
+            except ValidationError as e:
+                results.append(_row(number, "error", _validation_message(e)))
+
+        if members:
+            outcomes = await group_crud.add_students_to_group(group_id, [member for _, member in members])
+            if outcomes is None:
+                outcomes = [{"result": "error", "error": "Group not found"}] * len(members)
+            for (number, _), outcome in zip(members, outcomes):
+                results.append(_row(number, outcome["result"], outcome.get("error")))
+        return results
+
+
+bulk_import_crud = BulkImportCRUD()
@@ -0,0 +1,330 @@
+# Общий с student portal модуль: после правки обновите копию — python sync_shared.py
+"""
+История ревизий кода студентов.
+
+Каждое сохранение кода (student_assignment_code_submit.code — source "code",
+student_assignment_submit.code — source "submit") записывается ревизией в
+коллекцию code_revisions. Ревизии хранятся сегментами: документ сегмента
+начинается с ключевого кадра (полный текст, сжатый zlib), за ним идут
+построчные дельты от предыдущей ревизии. Новый сегмент начинается, когда
+дельты по объёму превысили CODE_REVISION_DELTA_RATIO размеров файла или их
+стало CODE_REVISION_MAX_CHAIN, поэтому любая ревизия собирается из одного
+документа за ограниченное время. Закрытый сегмент упаковывается целиком в
+один zlib-блок.
+
+Формат дельты — список операций над строками предыдущей ревизии:
+n > 0 — скопировать n строк, n < 0 — пропустить -n строк, строка — вставить,
+[p, s, текст] — заменить одну строку: её первые p и последние s символов
+остаются, между ними — текст.
+
+Ревизии пишут оба сервиса (backend и student portal). Дописывание в сегмент
+условно по номеру последней ревизии, поэтому при гонке процессов голова
+перечитывается из базы и запись повторяется.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+from .database import get_database
+import asyncio
+import json
+import logging
+import os
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# CODE_REVISION_HISTORY=0 отключает запись истории
+CODE_REVISION_HISTORY = os.getenv("CODE_REVISION_HISTORY", "1") == "1"
+CODE_REVISION_MAX_CHAIN = int(os.getenv("CODE_REVISION_MAX_CHAIN", "100"))
+# Новый сегмент, когда дельты сегмента в столько раз больше файла: ограничивает работу на сборку ревизии
+CODE_REVISION_DELTA_RATIO = float(os.getenv("CODE_REVISION_DELTA_RATIO", "4"))
+# Сколько последних версий кода держать в памяти, чтобы не собирать голову из базы
+CODE_REVISION_HEADS_SIZE = int(os.getenv("CODE_REVISION_HEADS_SIZE", "5000"))
+# Сколько раз перечитывать голову, если сегмент параллельно изменил другой процесс
+_APPEND_ATTEMPTS = 3
+
+CODE = "code"
+SUBMIT = "submit"
+SOURCES = (CODE, SUBMIT)
+
+Key = Tuple[str, str, str]
+_EPOCH = datetime(1970, 1, 1)
+
+
+def make_delta(old: str, new: str) -> list:
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if tag == "replace" and i2 - i1 == 1 and j2 - j1 == 1:
+            ops.append(_line_edit(a[i1], b[j1]))
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append("".join(b[j1:j2]))
+    return ops
+
+
+def _line_edit(old: str, new: str) -> list:
+    """Правка внутри строки: [длина общего начала, длина общего конца, вставка]"""
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return [prefix, suffix, new[prefix:len(new) - suffix]]
+
+
+def apply_delta(old: str, ops: list) -> str:
+    lines = old.splitlines(keepends=True)
+    pos, out = 0, []
+    for op in ops:
+        if isinstance(op, str):
+            out.append(op)
+        elif isinstance(op, list):
+            prefix, suffix, inserted = op
+            line = lines[pos]
+            out.append(line[:prefix] + inserted + line[len(line) - suffix:])
+            pos += 1
+        elif op > 0:
+            out.extend(lines[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _pack(revisions: List[dict]) -> bytes:
+    """Ревизии закрытого сегмента: [мс от предыдущей ревизии, размер, дельта]; номера идут подряд"""
+    rows, previous = [], _EPOCH
+    for revision in revisions:
+        rows.append([round((revision["at"] - previous).total_seconds() * 1000), revision["size"], revision.get("delta")])
+        previous = revision["at"]
+    return zlib.compress(_dumps(rows).encode(), 9)
+
+
+def _revisions(segment: dict) -> List[dict]:
+    """Ревизии сегмента [{rev, at, size, delta?}] — из открытого списка или упакованного блока"""
+    if "packed" not in segment:
+        return segment["revs"]
+    revisions, at = [], _EPOCH
+    for offset, (elapsed, size, delta) in enumerate(json.loads(zlib.decompress(segment["packed"]))):
+        at += timedelta(milliseconds=elapsed)
+        revisions.append({"rev": segment["first"] + offset, "at": at, "size": size, "delta": delta})
+    return revisions
+
+
+def _replay_segment(segment: dict) -> Iterator[Tuple[dict, str]]:
+    text = zlib.decompress(segment["key"]).decode()
+    for revision in _revisions(segment):
+        if revision.get("delta") is not None:
+            text = apply_delta(text, json.loads(revision["delta"]))
+        yield revision, text
+
+
+class CodeRevisionStore:
+    def __init__(
+        self,
+        get_db: Callable,
+        max_chain: int = CODE_REVISION_MAX_CHAIN,
+        heads_size: int = CODE_REVISION_HEADS_SIZE,
+        enabled: bool = CODE_REVISION_HISTORY
+    ):
+        self._get_db = get_db
+        self.enabled = enabled
+        self.max_chain = max_chain
+        self.heads_size = heads_size
+        # Последняя ревизия: ключ -> {rev, text, first, chain, delta_bytes}
+        self._heads: "OrderedDict[Key, dict]" = OrderedDict()
+
+    @property
+    def collection(self):
+        return self._get_db().code_revisions
+
+    async def record(
+        self,
+        student_id: str,
+        assignment_id: str,
+        code: Optional[str],
+        source: str = CODE,
+        at: Optional[datetime] = None
+    ) -> None:
+        await self.record_many([(student_id, assignment_id, code, at)], source)
+
+    async def record_many(self, items: List[tuple], source: str = CODE) -> None:
+        """
+        Записывает ревизии [(student_id, assignment_id, code, at)], разные ключи — параллельно.
+        Код, совпадающий с последней ревизией, пропускается. Ошибки только
+        логируются: история не должна ломать сохранение кода.
+        """
+        if not self.enabled:
+            return
+        latest = {}
+        for student_id, assignment_id, code, at in items:
+            latest[(source, student_id, assignment_id)] = (code or "", at or datetime.utcnow())
+        await asyncio.gather(*(self._record(key, code, at) for key, (code, at) in latest.items()))
+
+    async def _record(self, key: Key, code: str, at: datetime) -> None:
+        try:
+            for _ in range(_APPEND_ATTEMPTS):
+                if await self._append(key, code, at):
+                    return
+                # Сегмент изменил другой процесс: перечитываем голову
+                self._heads.pop(key, None)
+            logger.warning(f"Code revision for {key} was not recorded: concurrent writes")
+        except Exception as e:
+            self._heads.pop(key, None)
+            logger.error(f"Failed to record code revision for {key}: {e}")
+
+    async def _append(self, key: Key, code: str, at: datetime) -> bool:
+        head = self._heads.get(key)
+        if head is None:
+            head = await self._load_head(key)
+        if head is not None and head["text"] == code:
+            return True
+
+        source, student_id, assignment_id = key
+        query = {"student_id": student_id, "assignment_id": assignment_id, "source": source}
+        size = len(code.encode())
+        revision = {"rev": head["rev"] + 1 if head else 1, "at": at, "size": size}
+
+        if head is not None:
+            delta = _dumps(make_delta(head["text"], code))
+            if head["chain"] < self.max_chain and head["delta_bytes"] + len(delta) <= size * CODE_REVISION_DELTA_RATIO:
+                revision["delta"] = delta
+                result = await self.collection.update_one(
+                    {**query, "first": head["first"], "last": head["rev"], "sealed": False},
+                    {"$push": {"revs": revision}, "$set": {"last": revision["rev"]}}
+                )
+                if not result.modified_count:
+                    return False
+                self._remember(key, {
+                    "rev": revision["rev"], "text": code, "first": head["first"],
+                    "chain": head["chain"] + 1, "delta_bytes": head["delta_bytes"] + len(delta)
+                })
+                return True
+            if not await self._seal(query, head):
+                return False
+
+        try:
+            await self.collection.insert_one({
+                **query,
+                "first": revision["rev"],
+                "last": revision["rev"],
+                "sealed": False,
+                "key": zlib.compress(code.encode(), 9),
+                "revs": [revision]
+            })
+        except DuplicateKeyError:
+            return False
+        self._remember(key, {"rev": revision["rev"], "text": code, "first": revision["rev"], "chain": 0, "delta_bytes": 0})
+        return True
+
+    async def _seal(self, query: dict, head: dict) -> bool:
+        """Закрывает текущий сегмент и упаковывает его ревизии в один блок"""
+        segment = await self.collection.find_one_and_update(
+            {**query, "first": head["first"], "last": head["rev"], "sealed": False},
+            {"$set": {"sealed": True}},
+            projection={"revs": 1}
+        )
+        if segment is None:
+            return False
+        # Закрытый сегмент больше не меняется: упаковка только экономит место
+        await self.collection.update_one(
+            {"_id": segment["_id"]},
+            {"$set": {"packed": _pack(segment["revs"])}, "$unset": {"revs": ""}}
+        )
+        return True
+
+    async def _load_head(self, key: Key) -> Optional[dict]:
+        """Собирает последнюю ревизию из последнего сегмента"""
+        source, student_id, assignment_id = key
+        segment = await self.collection.find_one(
+            {"student_id": student_id, "assignment_id": assignment_id, "source": source},
+            sort=[("first", DESCENDING)]
+        )
+        if segment is None:
+            return None
+        chain, delta_bytes = -1, 0
+        for revision, text in _replay_segment(segment):
+            chain += 1
+            delta_bytes += len(revision.get("delta") or "")
+        head = {"rev": revision["rev"], "text": text, "first": segment["first"], "chain": chain, "delta_bytes": delta_bytes}
+        self._remember(key, head)
+        return head
+
+    def _remember(self, key: Key, head: dict) -> None:
+        self._heads[key] = head
+        self._heads.move_to_end(key)
+        while len(self._heads) > self.heads_size:
+            self._heads.popitem(last=False)
+
+    def _segments(self, student_id: str, assignment_id: str, source: str, start: int, end: Optional[int]):
+        query = {"student_id": student_id, "assignment_id": assignment_id, "source": source, "last": {"$gte": start}}
+        if end is not None:
+            query["first"] = {"$lte": end}
+        # Сегмент содержит до CODE_REVISION_MAX_CHAIN ревизий — читаем по одному
+        return self.collection.find(query).sort("first", ASCENDING).batch_size(1)
+
+    async def get_index(
+        self,
+        student_id: str,
+        assignment_id: str,
+        source: str = CODE,
+        start: int = 1,
+        end: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """Ревизии без кода: номер, время, размер и признак ключевого кадра"""
+        async for segment in self._segments(student_id, assignment_id, source, start, end):
+            for revision in _revisions(segment):
+                if revision["rev"] < start or (end is not None and revision["rev"] > end):
+                    continue
+                yield {
+                    "rev": revision["rev"],
+                    "created_at": revision["at"],
+                    "size": revision["size"],
+                    "keyframe": revision["rev"] == segment["first"]
+                }
+
+    async def get_revision(self, student_id: str, assignment_id: str, rev: int, source: str = CODE) -> Optional[dict]:
+        """Код ревизии rev: ключевой кадр её сегмента и дельты до неё"""
+        async for revision in self.replay(student_id, assignment_id, source, start=rev, end=rev):
+            return revision
+        return None
+
+    async def replay(
+        self,
+        student_id: str,
+        assignment_id: str,
+        source: str = CODE,
+        start: int = 1,
+        end: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """Ревизии start..end с полным кодом по одной, в памяти — только текущий сегмент"""
+        async for segment in self._segments(student_id, assignment_id, source, start, end):
+            for revision, text in _replay_segment(segment):
+                if end is not None and revision["rev"] > end:
+                    return
+                if revision["rev"] >= start:
+                    yield {
+                        "rev": revision["rev"],
+                        "created_at": revision["at"],
+                        "size": revision["size"],
+                        "code": text
+                    }
+
+
+code_revisions = CodeRevisionStore(get_database)
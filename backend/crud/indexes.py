@@ -0,0 +1,176 @@
+"""
+Реестр индексов MongoDB.
+
+Обе части проекта (backend и student-portal/backend) работают с одной базой
+crm_database, поэтому здесь описаны индексы под запросы обоих сервисов.
+Индексы создаются при старте backend или вручную:
+
+    python -m crud.indexes ensure
+    python -m crud.indexes report
+"""
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Для уникальных индексов по необязательным полям учитываем только заполненные значения
+_STRING = {"$type": "string"}
+
+
+def _page(field: str) -> IndexModel:
+    """
+    Индекс для постраничных и потоковых выборок по field с сортировкой по _id
+    (crud/pagination.py): страница читается из индекса по порядку, без сортировки
+    в памяти, поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+    return IndexModel([(field, ASCENDING), ("_id", ASCENDING)], name=f"{field}_id")
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("clerk_id", ASCENDING)], name="clerk_id_unique", unique=True,
+                   partialFilterExpression={"clerk_id": _STRING}),
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "students": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "regular_users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "enrollments": [
+        IndexModel([("student_id", ASCENDING), ("course_id", ASCENDING)],
+                   name="student_course_unique", unique=True),
+        _page("student_id"),
+        _page("course_id"),
+    ],
+    "lessons": [
+        IndexModel([("course_id", ASCENDING)], name="course_id"),
+    ],
+    "assignments": [
+        # Задания уроков портал читает по lesson_id $in с сортировкой по _id
+        _page("lesson_id"),
+    ],
+    "grades": [
+        # Оценки по одному заданию могут выставляться повторно, поэтому индекс не уникальный
+        IndexModel([("student_id", ASCENDING), ("assignment_id", ASCENDING)], name="student_assignment"),
+        IndexModel([("assignment_id", ASCENDING)], name="assignment_id"),
+        _page("student_id"),
+    ],
+    "attendance": [
+        IndexModel([("student_id", ASCENDING), ("group_id", ASCENDING), ("lesson_number", ASCENDING)],
+                   name="student_group_lesson_unique", unique=True),
+        IndexModel([("group_id", ASCENDING), ("lesson_number", ASCENDING)], name="group_lesson"),
+    ],
+    "student_assignment_submit": [
+        IndexModel([("student_id", ASCENDING), ("assignment_id", ASCENDING)],
+                   name="student_assignment_unique", unique=True),
+        _page("student_id"),
+        _page("lesson_id"),
+        _page("assignment_id"),
+    ],
+    "group_students": [
+        # Проверка дубликатов при добавлении в группу делается этими индексами
+        IndexModel([("group_id", ASCENDING), ("student_id", ASCENDING)], name="group_student_unique", unique=True),
+        IndexModel([("group_id", ASCENDING), ("email", ASCENDING)], name="group_email_unique", unique=True),
+        IndexModel([("student_id", ASCENDING)], name="student_id"),
+        # Состав группы читается по порядку добавления
+        _page("group_id"),
+    ],
+    "content_versions": [
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "student_assignment_code_submit": [
+        IndexModel([("student_id", ASCENDING), ("assignment_id", ASCENDING)],
+                   name="student_assignment_unique", unique=True),
+        _page("student_id"),
+    ],
+    # Сегменты истории кода (crud/code_revisions.py)
+    "code_revisions": [
+        IndexModel([("student_id", ASCENDING), ("assignment_id", ASCENDING), ("source", ASCENDING), ("first", ASCENDING)],
+                   name="student_assignment_source_first_unique", unique=True),
+    ],
+}
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """
+    Создаёт все объявленные индексы. Уже существующие индексы пропускаются сервером.
+    Возвращает словарь {коллекция: [ошибки]} для индексов, которые создать не удалось
+    (например, из-за дубликатов в данных при уникальном индексе).
+    """
+    errors: Dict[str, List[str]] = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        for model in models:
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                logger.error(f"Failed to create index {collection_name}.{name}: {e}")
+                errors.setdefault(collection_name, []).append(f"{name}: {e}")
+    return errors
+
+
+async def report_indexes(db: AsyncIOMotorDatabase) -> Dict[str, dict]:
+    """
+    Сравнивает объявленные индексы с реальными.
+    missing — объявлены, но отсутствуют; undeclared — есть в базе, но не в реестре;
+    unused — ни одного обращения с момента старта сервера по $indexStats.
+    """
+    report: Dict[str, dict] = {}
+    existing_collections = set(await db.list_collection_names())
+
+    for collection_name in sorted(set(INDEXES) | existing_collections):
+        if collection_name.startswith("system."):
+            continue
+        declared = {model.document["name"] for model in INDEXES.get(collection_name, [])}
+        collection = db[collection_name]
+
+        existing = set()
+        usage: Dict[str, int] = {}
+        if collection_name in existing_collections:
+            existing = set((await collection.index_information()).keys())
+            try:
+                async for stat in collection.aggregate([{"$indexStats": {}}]):
+                    usage[stat["name"]] = stat["accesses"]["ops"]
+            except OperationFailure as e:
+                logger.warning(f"$indexStats is not available for {collection_name}: {e}")
+        existing.discard("_id_")
+
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "unused": sorted(name for name in existing if usage.get(name, 1) == 0),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    from crud.database import get_database, close_mongo_connection
+
+    async def main(command: str):
+        db = get_database()
+        try:
+            if command == "ensure":
+                errors = await ensure_indexes(db)
+                for collection_name, messages in errors.items():
+                    for message in messages:
+                        print(f"[error] {collection_name}.{message}")
+                print("Indexes ensured" if not errors else "Indexes ensured with errors")
+            elif command == "report":
+                for collection_name, info in (await report_indexes(db)).items():
+                    if any(info.values()):
+                        print(f"{collection_name}: {info}")
+            else:
+                print("Usage: python -m crud.indexes [ensure|report]")
+        finally:
+            close_mongo_connection()
+
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "report"))
@@ -0,0 +1,84 @@
+"""
+Keyset-пагинация для списков.
+
+Вместо skip страница начинается строго после последнего документа предыдущей
+страницы (по _id или по ключу сортировки + _id), поэтому любая страница стоит
+столько же, сколько первая. Курсор непрозрачен для клиента: это base64 от
+значений ключа последнего документа.
+"""
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Any, List, Optional, Tuple
+import base64
+import os
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "10"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+# Размер пачки курсора для потоковых ответов
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "100"))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(doc: dict, sort_key: str = "_id") -> str:
+    values = [doc["_id"]] if sort_key == "_id" else [doc.get(sort_key), doc["_id"]]
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) not in (1, 2):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+async def paginate(
+    collection: AsyncIOMotorCollection,
+    query: Optional[dict] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = DEFAULT_PAGE_SIZE,
+    sort_key: str = "_id",
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Возвращает (документы страницы, курсор следующей страницы или None).
+    Для sort_key, отличного от _id, нужен индекс (sort_key, _id).
+    """
+    limit = clamp_limit(limit)
+    query = dict(query or {})
+
+    if after:
+        values = decode_cursor(after)
+        if sort_key == "_id":
+            condition = {"_id": {"$gt": values[-1]}}
+        else:
+            if len(values) != 2:
+                raise InvalidCursor("Invalid cursor")
+            value, last_id = values
+            condition = {"$or": [
+                {sort_key: {"$gt": value}},
+                {sort_key: value, "_id": {"$gt": last_id}}
+            ]}
+        query = {"$and": [query, condition]} if query else condition
+
+    sort = [("_id", 1)] if sort_key == "_id" else [(sort_key, 1), ("_id", 1)]
+    # Берём на один документ больше, чтобы понять, есть ли следующая страница
+    docs = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_key)
+    return docs, next_cursor
@@ -1,21 +1,5 @@
-import httpx
+from services.discord import notify_discord
 
-async def notify_discord(user):
-    webhook_url = "https://discord.com/api/webhooks/1333742158385254411/fjQxs06JMejYrLEnrtLR4vVAoJNbTPNSXKzulUEOiyFOFTnFDa-Ti9Y9ai_hHJLXsuS0"
-    message = {
-        "content": "Новый пользователь зарегистрирован!",
-        "embeds": [
-            {
-                "title": "Данные пользователя",
-                "fields": [
-                    {"name": "Имя", "value": user.first_name, "inline": True},
-                    {"name": "Фамилия", "value": user.last_name, "inline": True},
-                    {"name": "Email", "value": user.email, "inline": True},
-                    {"name": "Телефон", "value": user.phone, "inline": True},
-                ],
-                "color": 0x00FF00  # Зеленый цвет для красоты
-            }
-        ]
-    }
-    async with httpx.AsyncClient() as client:
-        await client.post(webhook_url, json=message)
\ No newline at end of file
+# Уведомления отправляет общий фоновый диспетчер services.discord
+# (общий httpx-клиент, очередь и пакетная отправка), адрес берётся из DISCORD_WEBHOOK_URL.
+__all__ = ["notify_discord"]
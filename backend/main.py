@@ -1,9 +1,18 @@
 from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 # Импортируем каждый модуль отдельно для гарантированной загрузки
 from api import users, courses, lessons, assignments, students, enrollments, groups, attendance, grades, assignment_submit
 # Явно импортируем student_code
 from api import student_code
+from api import imports
+from auth.jwks import jwks_store
+from auth.passwords import password_hasher
+from services.discord import dispatcher as discord_dispatcher
+from crud.database import connect_to_mongo, close_mongo_connection
+from crud.indexes import ensure_indexes
+from crud.course_crud import content_cache
+from api.responses import FastJSONResponse
 from dotenv import load_dotenv
 import os
 import logging
@@ -19,7 +28,30 @@ CLERK_PEM_PUBLIC_KEY = os.getenv("CLERK_PEM_PUBLIC_KEY")
 CLERK_AUDIENCE = os.getenv("CLERK_AUDIENCE")
 CLERK_ISSUER = os.getenv("CLERK_ISSUER")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Один клиент MongoDB с общим пулом соединений на весь процесс
+    db = connect_to_mongo()
+    if os.getenv("MONGO_ENSURE_INDEXES", "1") == "1":
+        try:
+            await ensure_indexes(db)
+        except Exception as e:
+            # Не роняем старт, если база недоступна: индексы можно создать через CLI
+            logger.error(f"Failed to ensure MongoDB indexes: {e}")
+    # Прогреваем кэш ключей Clerk, чтобы первый запрос не ждал сеть
+    await jwks_store.start()
+    await discord_dispatcher.start()
+    yield
+    # Дочищаем очередь уведомлений до закрытия клиентов
+    await discord_dispatcher.stop()
+    await jwks_store.close()
+    password_hasher.close()
+    close_mongo_connection()
+
 app = FastAPI(
+    lifespan=lifespan,
+    # orjson для всех ответов вместо стандартного json
+    default_response_class=FastJSONResponse,
     title="Student Back Portal API",
     description="API для управления студентами, курсами, оценками и посещаемостью",
     version="1.0.0",
@@ -34,7 +66,8 @@ app = FastAPI(
         {"name": "attendance", "description": "Операции с посещаемостью"},
         {"name": "grades", "description": "Операции с оценками"},
         {"name": "assignment_submit", "description": "Операции с отправкой заданий"},
-        {"name": "student_code", "description": "Операции с кодом заданий студентов"}
+        {"name": "student_code", "description": "Операции с кодом заданий студентов"},
+        {"name": "imports", "description": "Массовый импорт из CSV и JSON"}
     ]
 )
 
@@ -45,7 +78,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*", "Authorization", "Content-Type"],
-    expose_headers=["*"],
+    expose_headers=["*", "X-Next-Cursor"],
 )
 
 # Подключаем все роутеры
@@ -60,6 +93,12 @@ app.include_router(attendance.router)
 app.include_router(grades.router)
 app.include_router(assignment_submit.router)
 app.include_router(student_code.router)
+app.include_router(imports.router)
+
+# Статистика попаданий в кэш контента курсов
+@app.get("/metrics/cache")
+async def cache_metrics():
+    return {"content": content_cache.stats()}
 
 if __name__ == "__main__":
     import uvicorn
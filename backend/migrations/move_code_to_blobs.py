@@ -0,0 +1,81 @@
+"""
+Перенос больших текстов кода (шаблоны заданий, код студентов) в code_blobs.
+
+    python -m migrations.move_code_to_blobs            # перенести
+    python -m migrations.move_code_to_blobs --dry-run  # только посчитать
+    python -m migrations.move_code_to_blobs --gc       # удалить блобы без ссылок
+
+Повторный запуск безопасен: переносятся только тексты не короче
+CODE_BLOB_MIN_SIZE, которые ещё лежат в документе. Документ обновляется,
+только если текст не изменился с момента чтения. Сборщик мусора удаляет
+блобы, на которые не ссылается ни один документ и которые не использовались
+последний час (чтобы не удалить блоб, который прямо сейчас записывается).
+"""
+from datetime import datetime, timedelta
+import asyncio
+import sys
+
+from crud.database import get_database, close_mongo_connection
+from crud.blobs import BLOB_FIELDS, blob_store
+
+GC_GRACE_PERIOD = timedelta(hours=1)
+
+
+async def migrate(dry_run: bool = False):
+    db = get_database()
+    for collection_name, field in BLOB_FIELDS.items():
+        moved = chars = 0
+        cursor = db[collection_name].find(
+            {field: {"$type": "string"}, f"{field}_ref": {"$exists": False}},
+            {field: 1}
+        )
+        async for doc in cursor:
+            text = doc[field]
+            if not blob_store.is_large(text):
+                continue
+            moved += 1
+            chars += len(text)
+            if dry_run:
+                continue
+
+            ref = await blob_store.put(text)
+            await db[collection_name].update_one(
+                {"_id": doc["_id"], field: text},
+                {"$set": {f"{field}_ref": ref, f"{field}_size": len(text)}, "$unset": {field: ""}}
+            )
+
+        action = "Would move" if dry_run else "Moved"
+        print(f"{action} {moved} {collection_name}.{field} texts ({chars} chars)")
+
+
+async def collect_garbage(dry_run: bool = False):
+    db = get_database()
+    referenced = set()
+    for collection_name, field in BLOB_FIELDS.items():
+        referenced.update(await db[collection_name].distinct(f"{field}_ref"))
+
+    unused = []
+    cursor = db.code_blobs.find(
+        {"used_at": {"$lt": datetime.utcnow() - GC_GRACE_PERIOD}},
+        {"_id": 1}
+    )
+    async for blob in cursor:
+        if blob["_id"] not in referenced:
+            unused.append(blob["_id"])
+
+    if unused and not dry_run:
+        # Повторная проверка used_at: блоб мог снова понадобиться за время обхода
+        await db.code_blobs.delete_many({
+            "_id": {"$in": unused},
+            "used_at": {"$lt": datetime.utcnow() - GC_GRACE_PERIOD}
+        })
+    action = "Would delete" if dry_run else "Deleted"
+    print(f"{action} {len(unused)} unreferenced code blobs")
+
+
+if __name__ == "__main__":
+    dry_run = "--dry-run" in sys.argv
+    try:
+        asyncio.run(collect_garbage(dry_run) if "--gc" in sys.argv else migrate(dry_run))
+    finally:
+        close_mongo_connection()
@@ -0,0 +1,78 @@
+"""
+Перенос состава групп из массива groups.students в коллекцию group_students.
+
+    python -m migrations.move_group_rosters            # перенести
+    python -m migrations.move_group_rosters --dry-run  # только посчитать
+
+Повторный запуск безопасен: записи состава вставляются upsert'ом по
+(group_id, student_id). Повторы студента или email внутри старого состава
+уникальные индексы не пропускают: они выводятся в лог и не переносятся.
+После переноса students_count считается по реально записанным документам,
+а массив students удаляется. Группа, на которой запись упала по другой
+причине, остаётся со старым массивом. Затем backend запускается с GROUP_ROSTER_STORAGE=collection.
+"""
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime
+import asyncio
+import sys
+
+from crud.database import get_database, close_mongo_connection
+from crud.indexes import INDEXES
+
+
+async def migrate(dry_run: bool = False):
+    db = get_database()
+    if not dry_run:
+        await db.group_students.create_indexes(INDEXES["group_students"])
+
+    groups_moved = students_moved = duplicates = 0
+    failed_groups = []
+    cursor = db.groups.find({"students": {"$exists": True}}, {"students": 1})
+    async for group in cursor:
+        group_id = str(group["_id"])
+        students = group.get("students") or []
+        groups_moved += 1
+        students_moved += len(students)
+        if dry_run:
+            continue
+
+        if students:
+            try:
+                await db.group_students.bulk_write([
+                    UpdateOne(
+                        {"group_id": group_id, "student_id": student["student_id"]},
+                        {"$setOnInsert": {**student, "group_id": group_id, "added_at": datetime.utcnow()}},
+                        upsert=True
+                    )
+                    for student in students
+                ], ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                for error in errors:
+                    student = students[error["index"]]
+                    print(f"Group {group_id}: skipped student {student.get('student_id')} <{student.get('email')}>: "
+                          f"{error.get('errmsg')}")
+                duplicates += sum(1 for error in errors if error.get("code") == 11000)
+                if any(error.get("code") != 11000 for error in errors):
+                    failed_groups.append(group_id)
+                    continue
+        count = await db.group_students.count_documents({"group_id": group_id})
+        await db.groups.update_one(
+            {"_id": group["_id"]},
+            {"$set": {"students_count": count}, "$unset": {"students": ""}}
+        )
+
+    action = "Would move" if dry_run else "Moved"
+    print(f"{action} {students_moved} students from {groups_moved} groups")
+    if duplicates:
+        print(f"Skipped {duplicates} duplicate students")
+    if failed_groups:
+        print(f"Left {len(failed_groups)} groups unmigrated: {', '.join(failed_groups)}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(migrate(dry_run="--dry-run" in sys.argv))
+    finally:
+        close_mongo_connection()
@@ -0,0 +1,34 @@
+"""
+Пересчёт students_count у групп, хранящих состав в массиве students.
+
+    python -m migrations.recount_group_students            # пересчитать
+    python -m migrations.recount_group_students --dry-run  # только посчитать
+
+Группы, созданные до появления students_count, хранят его неверно или не
+хранят вовсе; вместимость проверяется по самому массиву, а счётчик нужен
+спискам групп, которые отдаются без состава.
+"""
+import asyncio
+import sys
+
+from crud.database import get_database, close_mongo_connection
+
+
+async def migrate(dry_run: bool = False):
+    db = get_database()
+    size = {"$size": "$students"}
+    query = {"students": {"$type": "array"}, "$expr": {"$ne": [{"$ifNull": ["$students_count", -1]}, size]}}
+    if dry_run:
+        count = await db.groups.count_documents(query)
+        print(f"Would recount {count} groups")
+        return
+
+    result = await db.groups.update_many(query, [{"$set": {"students_count": size}}])
+    print(f"Recounted {result.modified_count} groups")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(migrate(dry_run="--dry-run" in sys.argv))
+    finally:
+        close_mongo_connection()
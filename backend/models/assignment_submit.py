@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class AssignmentSubmitBase(BaseModel):
     is_submitted: bool = False
@@ -10,6 +10,12 @@ class AssignmentSubmitBase(BaseModel):
 class AssignmentSubmitCreate(AssignmentSubmitBase):
     pass
 
+class AssignmentSubmitBulk(BaseModel):
+    student_ids: List[str]
+    is_submitted: bool = True
+    # Если не указаны, отмечаются все задания урока
+    assignment_ids: Optional[List[str]] = None
+
 class AssignmentSubmit(AssignmentSubmitBase):
     id: str
     student_id: str
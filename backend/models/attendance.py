@@ -17,6 +17,16 @@ class AttendanceRecord(BaseModel):
     date: datetime = datetime.utcnow()
     comment: Optional[str] = None
 
+class AttendanceBulkEntry(BaseModel):
+    student_id: str
+    status: AttendanceStatus
+    comment: Optional[str] = None
+
+class AttendanceBulkRecord(BaseModel):
+    """Посещаемость всей группы за одно занятие"""
+    date: Optional[datetime] = None
+    records: List[AttendanceBulkEntry]
+
 class StudentAttendance(BaseModel):
     student_id: str
     first_name: str
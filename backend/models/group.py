@@ -42,6 +42,10 @@ class GroupStudent(BaseModel):
     total_points: int = 0
     status: str = "Admitted"  # Admitted/Pending/Rejected
     
+class GroupStudentsBulk(BaseModel):
+    """Несколько студентов для добавления в группу одним запросом"""
+    students: List[GroupStudent]
+
 class Group(BaseModel):
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
     name: str                      # Например "Poland PY Regular 19 (SAT-10)"
@@ -0,0 +1,248 @@
+"""
+Потоковый импорт CSV/JSON.
+
+Тело запроса читается по кускам и разбирается на строки по мере поступления:
+CSV (первая строка — заголовок), JSON-массив объектов или NDJSON. Строки
+собираются в пачки по IMPORT_BATCH_SIZE и передаются обработчику из
+crud.bulk_import. В памяти держится только текущая пачка и не больше
+IMPORT_MAX_ROW_SIZE символов одной строки. Повреждённая строка NDJSON
+попадает в отчёт ошибкой, остальные строки импортируются.
+"""
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+import codecs
+import csv
+import json
+import os
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# Сколько ошибок по строкам попадает в отчёт (счётчики считаются по всем)
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+# Самая длинная строка (элемент JSON), которую импорт держит в памяти целиком
+IMPORT_MAX_ROW_SIZE = int(os.getenv("IMPORT_MAX_ROW_SIZE", str(1024 * 1024)))
+
+CSV = "csv"
+JSON = "json"
+
+BatchHandler = Callable[[List[Tuple[int, dict]]], Awaitable[List[dict]]]
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    if explicit:
+        if explicit not in (CSV, JSON):
+            raise ImportFormatError("format must be 'csv' or 'json'")
+        return explicit
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return CSV
+    if "json" in content_type:
+        return JSON
+    raise ImportFormatError("Unknown file format: send Content-Type text/csv or application/json, or ?format=")
+
+
+async def _decode(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # utf-8-sig убирает BOM, который добавляет Excel; многобайтные символы на стыке кусков не рвутся
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        async for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"File is not valid UTF-8: {e}")
+    if tail:
+        yield tail
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Целые CSV-записи: перевод строки внутри кавычек запись не завершает"""
+    pending, record = "", ""
+    async for text in _decode(chunks):
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            record += line + "\n"
+            if record.count('"') % 2 == 0:
+                yield record
+                record = ""
+    record += pending
+    if record.strip():
+        yield record
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    header = None
+    async for record in _csv_records(chunks):
+        try:
+            values = next(csv.reader([record]), [])
+        except csv.Error as e:
+            raise ImportFormatError(f"Invalid CSV: {e}")
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        # Пустые ячейки не передаём, чтобы сработали значения по умолчанию модели
+        yield {name: value.strip() for name, value in zip(header, values) if name and value.strip()}
+
+
+class InvalidRow:
+    """Строка, которую не удалось разобрать: попадает в отчёт ошибкой, импорт продолжается"""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def _parse_line(line: str) -> object:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return InvalidRow(f"Invalid JSON: {e.msg}")
+
+
+async def _prepend(head: str, texts: AsyncIterator[str]) -> AsyncIterator[str]:
+    yield head
+    async for text in texts:
+        yield text
+
+
+async def _ndjson_rows(texts: AsyncIterator[str]) -> AsyncIterator[object]:
+    """NDJSON: строка за строкой, повреждённая строка — ошибка только этой строки"""
+    pending = ""
+    skipping = False
+    async for text in texts:
+        if skipping:
+            # Остаток слишком длинной строки пропускаем до перевода строки
+            newline = text.find("\n")
+            if newline < 0:
+                continue
+            text, skipping = text[newline + 1:], False
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+        if len(pending) > IMPORT_MAX_ROW_SIZE:
+            yield InvalidRow(f"Row is longer than {IMPORT_MAX_ROW_SIZE} characters")
+            pending, skipping = "", True
+    if pending.strip():
+        yield _parse_line(pending)
+
+
+async def _json_array_rows(texts: AsyncIterator[str]) -> AsyncIterator[object]:
+    """JSON-массив разбирается поэлементно через raw_decode"""
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    started = False
+    exhausted = False
+
+    async def more() -> bool:
+        nonlocal buffer, pos, exhausted
+        if exhausted:
+            return False
+        try:
+            text = await texts.__anext__()
+        except StopAsyncIteration:
+            exhausted = True
+            return False
+        buffer = buffer[pos:] + text
+        pos = 0
+        return True
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        if pos >= len(buffer):
+            if await more():
+                continue
+            raise ImportFormatError("Unexpected end of JSON array")
+        if not started:
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] == ",":
+            pos += 1
+            continue
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # Элемент мог оборваться на границе куска — дочитываем, но не дальше IMPORT_MAX_ROW_SIZE
+            if len(buffer) - pos > IMPORT_MAX_ROW_SIZE:
+                raise ImportFormatError(f"Row is longer than {IMPORT_MAX_ROW_SIZE} characters")
+            if await more():
+                continue
+            raise ImportFormatError(f"Invalid JSON: {e.msg}")
+        if end == len(buffer) and not exhausted:
+            # Число в конце буфера могло оборваться (12|34) — проверяем на следующем куске
+            if await more():
+                continue
+        pos = end
+        yield item
+
+
+async def iter_json_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """JSON-массив объектов или NDJSON — по первому непробельному символу"""
+    texts = _decode(chunks)
+    head = ""
+    async for text in texts:
+        head += text
+        if head.strip():
+            break
+    if not head.strip():
+        return
+    rows = _json_array_rows if head.lstrip()[0] == "[" else _ndjson_rows
+    async for row in rows(_prepend(head, texts)):
+        yield row
+
+
+async def run_import(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    handler: BatchHandler,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> dict:
+    """
+    Разбирает файл и обрабатывает его пачками. Отчёт: число строк, созданных
+    записей и ошибок, ошибки по строкам (номер строки данных, с 1). При
+    повреждённом файле импорт останавливается, уже записанные пачки остаются,
+    а причина возвращается в aborted.
+    """
+    report = {"total": 0, "created": 0, "failed": 0, "errors": []}
+    batch: List[Tuple[int, object]] = []
+
+    async def flush():
+        # Неразобранные строки и строки, которые не являются объектами, отсеиваются до обработчика
+        results = [
+            {"row": number, "result": "error", "error": row.error if isinstance(row, InvalidRow) else "Row must be an object"}
+            for number, row in batch if not isinstance(row, dict)
+        ]
+        valid = [(number, row) for number, row in batch if isinstance(row, dict)]
+        if valid:
+            results.extend(await handler(valid))
+        for row in sorted(results, key=lambda row: row["row"]):
+            if row["result"] in ("created", "added"):
+                report["created"] += 1
+                continue
+            report["failed"] += 1
+            if len(report["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+                report["errors"].append(row)
+        batch.clear()
+
+    rows = iter_csv_rows(chunks) if fmt == CSV else iter_json_rows(chunks)
+    try:
+        async for row in rows:
+            report["total"] += 1
+            batch.append((report["total"], row))
+            if len(batch) >= batch_size:
+                await flush()
+    except ImportFormatError as e:
+        report["aborted"] = str(e)
+    if batch:
+        await flush()
+    return report
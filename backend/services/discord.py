@@ -1,28 +1,161 @@
-import requests
-import os
 from models.user import User
+from typing import List, Optional
+import asyncio
+import httpx
+import logging
+import os
 
-async def notify_discord(user: User):
-    webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
-    if not webhook_url:
-        return
-        
-    message = {
-        "embeds": [{
-            "title": "Новый пользователь зарегистрирован!",
-            "fields": [
-                {"name": "Имя", "value": user.first_name, "inline": True},
-                {"name": "Фамилия", "value": user.last_name, "inline": True},
-                {"name": "Email", "value": str(user.email), "inline": True},
-                {"name": "Телефон", "value": user.phone, "inline": True},
-                {"name": "ID", "value": user.clerk_id, "inline": True},
-                {"name": "Комментарий", "value": user.comment or "Нет", "inline": True}
-            ],
-            "color": 5814783
-        }]
-    }
-    
+logger = logging.getLogger(__name__)
+
+# Discord принимает не больше 10 embeds в одном сообщении
+MAX_EMBEDS_PER_MESSAGE = 10
+DISCORD_QUEUE_SIZE = int(os.getenv("DISCORD_QUEUE_SIZE", "1000"))
+# Сколько секунд ждать, пока в очереди наберутся embeds для одного сообщения
+DISCORD_BATCH_WINDOW = float(os.getenv("DISCORD_BATCH_WINDOW", "2"))
+DISCORD_MAX_RETRIES = int(os.getenv("DISCORD_MAX_RETRIES", "5"))
+DISCORD_DRAIN_TIMEOUT = float(os.getenv("DISCORD_DRAIN_TIMEOUT", "10"))
+
+
+class DiscordDispatcher:
+    """
+    Фоновая отправка уведомлений в Discord webhook.
+
+    Уведомления кладутся в ограниченную очередь и сразу возвращают управление.
+    Фоновая задача собирает их в сообщения до 10 embeds, отправляет через общий
+    httpx-клиент и повторяет при 429/5xx с учётом retry_after. При остановке
+    очередь дочищается, но не дольше drain_timeout.
+    """
+
+    def __init__(
+        self,
+        webhook_url: Optional[str] = None,
+        queue_size: int = DISCORD_QUEUE_SIZE,
+        batch_window: float = DISCORD_BATCH_WINDOW,
+        max_retries: int = DISCORD_MAX_RETRIES,
+        drain_timeout: float = DISCORD_DRAIN_TIMEOUT
+    ):
+        self._webhook_url = webhook_url
+        self.queue_size = queue_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.drain_timeout = drain_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._draining = False
+
+    @property
+    def webhook_url(self) -> Optional[str]:
+        return self._webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+
+    async def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._client = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_connections=2))
+        self._draining = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def enqueue(self, embed: dict) -> bool:
+        """Ставит embed в очередь; False, если webhook не настроен или очередь переполнена"""
+        if not self.webhook_url:
+            return False
+        await self.start()
+        try:
+            self._queue.put_nowait(embed)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Discord notification queue is full, dropping notification")
+            return False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < MAX_EMBEDS_PER_MESSAGE:
+                if self._draining:
+                    if self._queue.empty():
+                        break
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._send(batch)
+            except Exception as e:
+                logger.error(f"Discord notification failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send(self, embeds: List[dict]) -> None:
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            wait = delay
+            try:
+                response = await self._client.post(self.webhook_url, json={"embeds": embeds})
+            except httpx.HTTPError as e:
+                logger.warning(f"Discord webhook request failed: {e}")
+            else:
+                if response.status_code == 429:
+                    wait = _retry_after(response, delay)
+                elif response.status_code < 500:
+                    if response.is_error:
+                        logger.error(f"Discord webhook rejected message: {response.status_code} {response.text}")
+                    return
+            if attempt < self.max_retries:
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, 30.0)
+        logger.error(f"Discord notification dropped after {self.max_retries} retries")
+
+    async def stop(self) -> None:
+        """Отправляет оставшиеся уведомления и закрывает клиент"""
+        if self._worker is None:
+            return
+        self._draining = True
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Discord queue not drained, {self._queue.qsize()} notifications lost")
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        await self._client.aclose()
+        self._worker = None
+        self._client = None
+        self._queue = None
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    """Время ожидания из ответа 429: тело retry_after или заголовок Retry-After (в секундах)"""
     try:
-        requests.post(webhook_url, json=message)
+        return float(response.json()["retry_after"])
     except Exception:
-        pass  # Игнорируем ошибки уведомлений 
\ No newline at end of file
+        pass
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return default
+
+
+dispatcher = DiscordDispatcher()
+
+
+async def notify_discord(user: User):
+    await dispatcher.enqueue({
+        "title": "Новый пользователь зарегистрирован!",
+        "fields": [
+            {"name": "Имя", "value": user.first_name, "inline": True},
+            {"name": "Фамилия", "value": user.last_name, "inline": True},
+            {"name": "Email", "value": str(user.email), "inline": True},
+            {"name": "Телефон", "value": user.phone, "inline": True},
+            {"name": "ID", "value": user.clerk_id, "inline": True},
+            {"name": "Комментарий", "value": user.comment or "Нет", "inline": True}
+        ],
+        "color": 5814783
+    })
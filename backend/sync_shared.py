@@ -0,0 +1,71 @@
+"""
+Общие модули backend и student portal.
+
+Обе части проекта работают с одной базой, поэтому часть кода у них должна
+совпадать байт в байт: формат истории кода и блобов, версии кэша контента,
+хеширование паролей. Оригиналы лежат в backend, копии в student-portal/backend
+генерируются этим скриптом — вручную их не правят. Отличаются копии только
+подключением к базе (у портала это dependencies.database.db).
+
+    python sync_shared.py          # перегенерировать копии портала
+    python sync_shared.py --check  # выйти с кодом 1, если копии отличаются
+"""
+from typing import Dict, List, Tuple
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PORTAL_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "student-portal", "backend")
+
+# Модуль -> замены (строка backend, строка портала); каждая должна встретиться ровно один раз
+SHARED_MODULES: Dict[str, List[Tuple[str, str]]] = {
+    "crud/code_revisions.py": [
+        ("from .database import get_database\n", "from dependencies.database import db\n"),
+        ("code_revisions = CodeRevisionStore(get_database)\n", "code_revisions = CodeRevisionStore(lambda: db)\n"),
+    ],
+    "crud/blobs.py": [
+        ("from .database import get_database\n", "from dependencies.database import db\n"),
+        ("blob_store = BlobStore(get_database)\n", "blob_store = BlobStore(lambda: db)\n"),
+    ],
+    "crud/content_cache.py": [],
+    "auth/passwords.py": [],
+}
+
+
+def render(module: str) -> str:
+    """Текст копии модуля для портала"""
+    with open(os.path.join(BACKEND_DIR, module), encoding="utf-8") as f:
+        text = f.read()
+    for backend_line, portal_line in SHARED_MODULES[module]:
+        if text.count(backend_line) != 1:
+            raise ValueError(f"backend/{module}: expected exactly one {backend_line.strip()!r}")
+        text = text.replace(backend_line, portal_line)
+    return f"# Сгенерировано из backend/{module} скриптом backend/sync_shared.py — правьте оригинал\n{text}"
+
+
+def main(check: bool) -> int:
+    stale = []
+    for module in SHARED_MODULES:
+        path = os.path.join(PORTAL_DIR, module)
+        expected = render(module)
+        try:
+            with open(path, encoding="utf-8") as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current == expected:
+            continue
+        stale.append(module)
+        if not check:
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(expected)
+
+    for module in stale:
+        print(f"{'Out of sync' if check else 'Updated'}: student-portal/backend/{module}")
+    if not stale:
+        print("Shared modules are in sync")
+    return 1 if check and stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(check="--check" in sys.argv))
@@ -47,15 +47,10 @@ const AttendanceTable = ({ groupId, students, courseName, totalLessonsCount }) =
     const fetchAttendance = async () => {
         console.log('Fetching attendance for group:', groupId);
         try {
-            const response = await api.get(`/attendance/group/${groupId}`);
+            // Matrix student_id -> {lesson_number: status} is built on the server
+            const response = await api.get(`/attendance/group/${groupId}/stats`);
             console.log('Attendance data:', response.data);
-            const attendanceMap = {};
-            response.data.forEach(record => {
-                const studentId = record.student_id || record._id;
-                attendanceMap[studentId] = record.attendance;
-            });
-            setAttendance(attendanceMap);
-            console.log('Updated attendance state:', attendanceMap);
+            setAttendance(response.data.matrix || {});
         } catch (error) {
             console.error('Error fetching attendance:', error);
         } finally {
@@ -84,6 +79,32 @@ const AttendanceTable = ({ groupId, students, courseName, totalLessonsCount }) =
         }
     };
 
+    const handleMarkLesson = async (lessonNumber) => {
+        // Already recorded marks (absent, notified) are never overwritten
+        const unmarked = students.filter(student => {
+            const status = attendance[student.student_id]?.[lessonNumber];
+            return !status || status === ATTENDANCE_STATUS.UNASSIGNED;
+        });
+        if (unmarked.length === 0) {
+            return;
+        }
+        if (!window.confirm(`Mark ${unmarked.length} unmarked student(s) as present for lesson ${lessonNumber}?`)) {
+            return;
+        }
+        try {
+            await api.post(`/attendance/${groupId}/lessons/${lessonNumber}/record`, {
+                date: new Date().toISOString(),
+                records: unmarked.map(student => ({
+                    student_id: student.student_id,
+                    status: ATTENDANCE_STATUS.PRESENT
+                }))
+            });
+            await fetchAttendance();
+        } catch (error) {
+            console.error('Error updating lesson attendance:', error);
+        }
+    };
+
     if (isLoading) {
         return (
             <div className="flex justify-center items-center h-64">
@@ -124,7 +145,13 @@ const AttendanceTable = ({ groupId, students, courseName, totalLessonsCount }) =
                                         scope="col"
                                         className="px-3 py-3 text-center text-sm font-semibold text-gray-900 bg-gray-50"
                                     >
-                                        {i + 1}
+                                        <button
+                                            onClick={() => handleMarkLesson(i + 1)}
+                                            title="Mark unmarked students present"
+                                            className="hover:text-indigo-600 focus:outline-none"
+                                        >
+                                            {i + 1}
+                                        </button>
                                     </th>
                                 ))}
                             </tr>
@@ -136,10 +163,7 @@ const AttendanceTable = ({ groupId, students, courseName, totalLessonsCount }) =
                                         {student.first_name} {student.last_name}
                                     </td>
                                     {[...Array(totalLessons)].map((_, i) => {
-                                        const lessonRecord = attendance[student.student_id]?.find(
-                                            a => a.lesson_number === i + 1
-                                        );
-                                        const status = lessonRecord?.status || ATTENDANCE_STATUS.UNASSIGNED;
+                                        const status = attendance[student.student_id]?.[i + 1] || ATTENDANCE_STATUS.UNASSIGNED;
 
                                         return (
                                             <td key={i} className="px-3 py-4 text-sm text-center">
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from typing import List
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
 from models.assignment_submission import (
     AssignmentSubmissionCreate,
     AssignmentSubmissionUpdate,
@@ -8,10 +9,12 @@ from models.assignment_submission import (
 )
 from models.student import StudentInDB
 from crud import assignment_submission as crud
+from crud.autosave import autosave_buffer
 from dependencies.database import get_student_assignment_submit_collection
 from datetime import datetime
 from bson import ObjectId
 from auth.jwt import get_current_student
+from api.responses import trusted
 
 router = APIRouter(
     prefix="/assignment-submission",
@@ -45,7 +48,17 @@ async def create_assignment_submission(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Submission for this assignment already exists"
         )
-    return await crud.create_submission(collection, submission_data)
+    if submission_data.is_submitted:
+        # Сдаётся последний код из редактора, а не версия с прошлой записи буфера
+        await autosave_buffer.flush_student_assignment(submission_data.student_id, submission_data.assignment_id)
+    try:
+        return await crud.create_submission(collection, submission_data)
+    except DuplicateKeyError:
+        # Параллельный запрос (двойной клик) уже создал сабмит — уникальный индекс не дал дубль
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Submission for this assignment already exists"
+        )
 
 @router.get("/{submission_id}", response_model=AssignmentSubmissionInDB)
 async def get_assignment_submission(
@@ -88,7 +101,7 @@ async def get_student_submissions(
             detail="You can only view your own submissions"
         )
         
-    return await crud.get_submissions_by_student(collection, student_id)
+    return trusted(await crud.get_submissions_by_student(collection, student_id))
 
 @router.get("/lesson/{lesson_id}", response_model=List[AssignmentSubmissionInDB])
 async def get_lesson_submissions(
@@ -101,7 +114,7 @@ async def get_lesson_submissions(
     """
     # Фильтруем результаты, чтобы показать только записи текущего студента
     submissions = await crud.get_submissions_by_lesson(collection, lesson_id)
-    return [sub for sub in submissions if sub.student_id == current_student.id]
+    return trusted([sub for sub in submissions if sub.student_id == current_student.id])
 
 @router.get("/student/{student_id}/assignment/{assignment_id}", response_model=AssignmentSubmissionInDB)
 async def get_student_assignment_submission(
@@ -199,6 +212,8 @@ async def update_assignment_submission(
     # Добавляем дату отправки, если is_submitted = True и submit_date не указана
     if submission_data.is_submitted and not submission_data.submit_date:
         submission_data.submit_date = datetime.utcnow()
+    if submission_data.is_submitted:
+        await autosave_buffer.flush_student_assignment(current_submission.student_id, current_submission.assignment_id)
         
     submission = await crud.update_submission(collection, submission_id, submission_data)
     if not submission:
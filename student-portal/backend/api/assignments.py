@@ -3,6 +3,7 @@ from models.student import StudentInDB
 from models.assignment import AssignmentUpdate, AssignmentInDB
 from auth.jwt import get_current_student
 from crud.course_crud import course_crud
+from crud.access_control import access_control
 import crud.assignments as crud
 from typing import Any, Dict, List
 from motor.motor_asyncio import AsyncIOMotorCollection
@@ -25,19 +26,16 @@ async def get_assignment_by_id(
             detail="Задание не найдено"
         )
     
-    # Получаем урок, к которому принадлежит задание
-    lesson_id = assignment.get("lesson_id")
-    lesson = await course_crud.get_lesson_by_id(lesson_id)
-    if not lesson:
+    # Получаем курс урока, к которому принадлежит задание
+    course_id = await access_control.get_lesson_course_id(assignment.get("lesson_id"))
+    if not course_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Урок не найден"
         )
     
     # Проверяем, имеет ли студент доступ к курсу этого урока
-    course_id = lesson.get("course_id")
-    student_courses = await course_crud.get_student_courses(current_student.id)
-    if not any(course["id"] == course_id for course in student_courses):
+    if not await access_control.can_access_course(current_student.id, course_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="У вас нет доступа к этому заданию"
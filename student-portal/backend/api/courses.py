@@ -2,6 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from models.student import StudentInDB
 from auth.jwt import get_current_student
 from crud.course_crud import course_crud
+from crud.access_control import access_control
+from crud.dashboard import get_course_dashboard
+from api.responses import trusted
 from typing import Any, List, Dict
 
 router = APIRouter(prefix="/courses", tags=["courses"])
@@ -10,7 +13,7 @@ router = APIRouter(prefix="/courses", tags=["courses"])
 async def get_student_courses(current_student: StudentInDB = Depends(get_current_student)) -> Any:
     """Получает список курсов, на которые записан студент"""
     courses = await course_crud.get_student_courses(current_student.id)
-    return courses
+    return trusted(courses)
 
 @router.get("/{course_id}", response_model=Dict[str, Any])
 async def get_course_by_id(
@@ -19,8 +22,7 @@ async def get_course_by_id(
 ) -> Any:
     """Получает информацию о конкретном курсе по его ID"""
     # Проверяем, записан ли студент на этот курс
-    student_courses = await course_crud.get_student_courses(current_student.id)
-    if not any(course["id"] == course_id for course in student_courses):
+    if not await access_control.can_access_course(current_student.id, course_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="У вас нет доступа к этому курсу"
@@ -33,7 +35,7 @@ async def get_course_by_id(
             detail="Курс не найден"
         )
     
-    return course
+    return trusted(course)
 
 @router.get("/{course_id}/lessons", response_model=List[Dict[str, Any]])
 async def get_course_lessons(
@@ -42,12 +44,31 @@ async def get_course_lessons(
 ) -> Any:
     """Получает список уроков для конкретного курса"""
     # Проверяем, записан ли студент на этот курс
-    student_courses = await course_crud.get_student_courses(current_student.id)
-    if not any(course["id"] == course_id for course in student_courses):
+    if not await access_control.can_access_course(current_student.id, course_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="У вас нет доступа к этому курсу"
         )
     
     lessons = await course_crud.get_course_lessons(course_id)
-    return lessons 
\ No newline at end of file
+    return trusted(lessons) 
+
+@router.get("/{course_id}/dashboard", response_model=Dict[str, Any])
+async def get_course_dashboard_page(
+    course_id: str,
+    current_student: StudentInDB = Depends(get_current_student)
+) -> Any:
+    """Страница курса одним запросом: уроки, задания и по каждому заданию сдача, код и оценка студента"""
+    if not await access_control.can_access_course(current_student.id, course_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="У вас нет доступа к этому курсу"
+        )
+
+    dashboard = await get_course_dashboard(current_student.id, course_id)
+    if not dashboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Курс не найден"
+        )
+    return trusted(dashboard)
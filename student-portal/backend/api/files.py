@@ -1,9 +1,16 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from multipart.multipart import MultipartParser, parse_options_header
+from email.utils import formatdate
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import quote
+import logging
+import mimetypes
 import os
-import shutil
-from typing import List
-import uuid
+import re
+
+from crud.file_storage import FileTooLargeError, file_storage
+
+logger = logging.getLogger(__name__)
 
 # Маршрутизатор для работы с файлами
 router = APIRouter(
@@ -11,85 +18,290 @@ router = APIRouter(
     tags=["files"]
 )
 
-# Базовая директория для загрузки файлов
-UPLOAD_DIR = "uploads"
+# Префикс internal-location nginx: если задан, файл отдаёт nginx через sendfile
+FILES_ACCEL_REDIRECT = os.getenv("FILES_ACCEL_REDIRECT", "")
+# Запас на заголовки multipart сверх размера самого файла
+MULTIPART_OVERHEAD = 64 * 1024
+
+_EXTENSION = re.compile(r"^\.[A-Za-z0-9]{1,16}$")
+
+_UPLOAD_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            }
+        }
+    }
+}
+
+
+class _MultipartFileReader:
+    """
+    Разбор multipart/form-data по мере чтения тела запроса: события парсера
+    складываются в очередь и отдаются после каждого куска. В памяти держится
+    только текущий кусок, а не весь файл.
+    """
+
+    def __init__(self, content_type: str):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ожидается multipart/form-data"
+            )
+        self.events: List[Tuple[str, object]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        self.events.append(("begin", (name, filename.decode("utf-8", "replace") if filename is not None else None)))
 
-# Создаем директорию, если она не существует
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self.events.append(("data", data[start:end]))
 
-@router.post("/upload", status_code=status.HTTP_201_CREATED)
-async def upload_file(file: UploadFile = File(...)):
+    def _on_part_end(self) -> None:
+        self.events.append(("end", None))
+
+    async def iter_events(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, object]]:
+        async for chunk in chunks:
+            self.parser.write(chunk)
+            events, self.events = self.events, []
+            for event in events:
+                yield event
+        self.parser.finalize()
+        for event in self.events:
+            yield event
+
+
+@router.post("/upload", status_code=status.HTTP_201_CREATED, openapi_extra=_UPLOAD_SCHEMA)
+async def upload_file(request: Request):
     """
-    Загрузка файла на сервер.
+    Загрузка файла на сервер (multipart/form-data, поле file).
     Возвращает путь к загруженному файлу, который можно затем использовать
-    для прикрепления к заданию в поле attachments.
+    для прикрепления к заданию в поле attachments, его размер и sha256.
+    Файл больше FILES_MAX_UPLOAD_SIZE отклоняется с 413, не дочитываясь до конца.
     """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > file_storage.max_size + MULTIPART_OVERHEAD:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Файл больше {file_storage.max_size} байт"
+        )
+
+    reader = _MultipartFileReader(request.headers.get("content-type", ""))
+    result = None
     try:
-        # Создаем директорию, если ее нет
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        
-        # Генерируем уникальное имя файла
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        
-        # Полный путь для сохранения файла
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        # Выводим отладочную информацию
-        print(f"Сохраняем файл {file.filename} как {unique_filename} в {file_path}")
-        
-        # Сохраняем файл
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Возвращаем относительный путь к файлу
-        return {"filename": unique_filename, "path": file_path}
-    
+        events = reader.iter_events(request.stream())
+        async for event, value in events:
+            if event != "begin" or result is not None:
+                continue
+            name, filename = value
+            if name != "file" or filename is None:
+                continue
+            extension = os.path.splitext(filename)[1]
+            async with file_storage.upload(extension if _EXTENSION.match(extension) else "") as writer:
+                async for event, value in events:
+                    if event == "end":
+                        break
+                    await writer.write(value)
+                else:
+                    # Тело закончилось посреди файла
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Загрузка прервана"
+                    )
+                result = await writer.commit()
+            logger.info(f"Saved upload {filename} as {result['filename']} ({result['size']} bytes)")
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Файл больше {file_storage.max_size} байт"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Ошибка при загрузке файла: {str(e)}")
+        logger.error(f"Ошибка при загрузке файла: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка при загрузке файла: {str(e)}"
         )
-    finally:
-        await file.close()
 
-@router.get("/{filename}")
-async def get_file(filename: str):
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Поле file с файлом не передано"
+        )
+    return result
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Один диапазон bytes=a-b / a- / -n как (start, end) включительно.
+    None — заголовок не разобран или диапазонов несколько: отдаётся весь файл.
+    (size, size) — диапазон вне файла (416).
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            return size, size
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return size, size
+    if end < start:
+        return None
+    return start, end
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Слабое сравнение: W/"x" совпадает с "x"
+    tags = (tag.strip() for tag in header.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
+class FileStreamResponse(Response):
+    """
+    Отдача файла или его диапазона: через расширение ASGI http.response.pathsend
+    (сервер отправляет файл сам, без чтения в Python), иначе кусками из пула
+    потоков file_storage.
+    """
+
+    def __init__(self, filename: str, start: int, end: int, status_code: int, headers: dict):
+        super().__init__(status_code=status_code, headers=headers)
+        self.filename = filename
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        whole = self.status_code == status.HTTP_200_OK
+        if whole and "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(file_storage.path(self.filename))})
+            return
+        chunks = file_storage.read(self.filename, self.start, self.end)
+        try:
+            async for chunk in chunks:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            await chunks.aclose()
+        await send({"type": "http.response.body", "body": b""})
+
+
+@router.api_route("/{filename}", methods=["GET", "HEAD"])
+async def get_file(filename: str, request: Request):
     """
     Получение файла по имени файла.
+    Поддерживает Range (один диапазон, 206) и If-None-Match / If-Range по ETag.
     """
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
-    if not os.path.exists(file_path):
+    file_stat = await file_storage.stat(filename)
+    if file_stat is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Файл не найден"
         )
-        
-    return FileResponse(
-        file_path, 
-        filename=os.path.basename(file_path)
-    )
+
+    size = file_stat.st_size
+    # Файлы не перезаписываются, поэтому ETag по времени изменения и размеру строгий
+    etag = f'"{file_stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(file_stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=31536000, immutable",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers["Content-Type"] = media_type
+    headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    if FILES_ACCEL_REDIRECT:
+        # nginx сам обработает Range и отдаст файл через sendfile
+        headers["X-Accel-Redirect"] = FILES_ACCEL_REDIRECT.rstrip("/") + "/" + quote(filename)
+        return Response(headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return FileStreamResponse(filename, 0, size - 1, status.HTTP_200_OK, headers)
+
+    start, end = byte_range
+    if start >= size:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return FileStreamResponse(filename, start, end, status.HTTP_206_PARTIAL_CONTENT, headers)
+
 
 @router.delete("/{filename}")
 async def delete_file(filename: str):
     """
     Удаление файла по имени файла.
     """
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
-    if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Файл не найден"
-        )
-    
     try:
-        os.remove(file_path)
-        return {"message": "Файл успешно удален"}
+        deleted = await file_storage.delete(filename)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка при удалении файла: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Файл не найден"
+        )
+    return {"message": "Файл успешно удален"}
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from models.student import StudentInDB
 from auth.jwt import get_current_student
 from crud.course_crud import course_crud
+from crud.access_control import access_control
 from typing import Any, List, Dict
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
@@ -21,9 +22,7 @@ async def get_lesson_by_id(
         )
     
     # Проверяем, имеет ли студент доступ к курсу этого урока
-    course_id = lesson.get("course_id")
-    student_courses = await course_crud.get_student_courses(current_student.id)
-    if not any(course["id"] == course_id for course in student_courses):
+    if not await access_control.can_access_course(current_student.id, lesson.get("course_id")):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="У вас нет доступа к этому уроку"
@@ -37,18 +36,16 @@ async def get_lesson_assignments(
     current_student: StudentInDB = Depends(get_current_student)
 ) -> Any:
     """Получает список заданий для конкретного урока"""
-    # Получаем урок
-    lesson = await course_crud.get_lesson_by_id(lesson_id)
-    if not lesson:
+    # Получаем курс урока
+    course_id = await access_control.get_lesson_course_id(lesson_id)
+    if not course_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Урок не найден"
         )
     
     # Проверяем, имеет ли студент доступ к курсу этого урока
-    course_id = lesson.get("course_id")
-    student_courses = await course_crud.get_student_courses(current_student.id)
-    if not any(course["id"] == course_id for course in student_courses):
+    if not await access_control.can_access_course(current_student.id, course_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="У вас нет доступа к этому уроку"
@@ -0,0 +1,49 @@
+"""
+Быстрая сериализация ответов.
+
+FastJSONResponse — ответ по умолчанию для student portal: orjson вместо json,
+ObjectId и datetime сериализуются без jsonable_encoder и CustomJSONEncoder.
+
+trusted() — путь для данных, которые CRUD-слой уже собрал в модели: FastAPI
+не валидирует их повторно по response_model, модели сразу пишутся в JSON.
+response_model на маршруте остаётся для документации OpenAPI.
+"""
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from bson import ObjectId
+from typing import Any, Optional
+import orjson
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        # Так же, как FastAPI сериализует response_model: по алиасам, в JSON-режиме
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Отдаёт content без повторной валидации по response_model.
+    response — внедрённый в маршрут Response: его заголовки переносятся в ответ.
+    """
+    result = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        if response.status_code:
+            result.status_code = response.status_code
+        result.headers.raw.extend(response.headers.raw)
+    return result
@@ -7,6 +7,7 @@ from models.student_code_submission import (
     StudentCodeSubmissionInDB
 )
 import crud.student_code_submission as crud
+from crud.autosave import autosave_buffer
 from dependencies.database import get_student_code_submit_collection
 from auth.jwt import get_current_student
 from models.student import StudentInDB
@@ -92,6 +93,11 @@ async def get_student_assignment_code(
             updated_at=datetime.utcnow()
         )
     
+    # Автосохранение, которое ещё не записано в базу
+    pending = autosave_buffer.peek(student_id, assignment_id)
+    if pending:
+        submission = submission.model_copy(update=pending)
+    
     return submission
 
 @router.patch("/student/{student_id}/assignment/{assignment_id}", response_model=StudentCodeSubmissionInDB)
@@ -103,8 +109,9 @@ async def update_student_assignment_code(
     collection: AsyncIOMotorCollection = Depends(get_student_code_submit_collection)
 ):
     """
-    Обновление кода студента для конкретного задания.
-    Если запись еще не существует, создает новую.
+    Обновление кода студента для конкретного задания (автосохранение редактора).
+    Если запись еще не существует, создает новую. Код пишется в базу
+    пачками через буфер автосохранения.
     """
     # Проверяем, что студент обновляет только свои записи
     if student_id != current_student.id:
@@ -113,6 +120,9 @@ async def update_student_assignment_code(
             detail="Вы можете обновлять только свои записи"
         )
     
+    if code_data.code is not None:
+        return await autosave_buffer.save(student_id, assignment_id, code_data.code)
+    
     submission = await crud.update_code_submission(collection, student_id, assignment_id, code_data)
     if not submission:
         raise HTTPException(
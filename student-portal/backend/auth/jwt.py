@@ -49,8 +49,8 @@ async def get_current_student(token: str = Depends(oauth2_scheme)) -> StudentInD
     except JWTError:
         raise credentials_exception
     
-    # Получаем студента из базы данных по ID
-    student = await student_crud.get_student_by_id(token_data.student_id)
+    # Берём студента из кэша сессий; в базу идём только при промахе
+    student = await student_crud.get_student_session(token_data.student_id)
     if student is None:
         raise credentials_exception
         
@@ -0,0 +1,58 @@
+# Сгенерировано из backend/auth/passwords.py скриптом backend/sync_shared.py — правьте оригинал
+# Общий с student portal модуль: после правки обновите копию — python sync_shared.py
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from typing import Optional, Tuple
+import asyncio
+import os
+
+# Стоимость bcrypt и размер пула потоков для хеширования
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей bcrypt в отдельном пуле потоков.
+    bcrypt отпускает GIL, поэтому расчёт хеша не блокирует event loop,
+    а размер пула ограничивает нагрузку на CPU при всплеске логинов.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, max_workers: int = PASSWORD_HASH_WORKERS):
+        self.rounds = rounds
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def hash(self, password: str, rounds: Optional[int] = None) -> str:
+        """
+        rounds — своя стоимость для этого хеша (например, при массовом импорте).
+        Хеш с другой стоимостью портал пересчитает при первом входе.
+        """
+        if rounds is None or rounds == self.rounds:
+            return await self._run(self.context.hash, password)
+        return await self._run(self.context.handler("bcrypt").using(rounds=rounds).hash, password)
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> bool:
+        valid, _ = await self.verify_and_update(password, hashed_password)
+        return valid
+
+    async def verify_and_update(self, password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Проверяет пароль. Если хеш создан с другой стоимостью,
+        вторым элементом возвращает новый хеш для сохранения.
+        """
+        if not hashed_password:
+            return False, None
+        try:
+            return await self._run(self.context.verify_and_update, password, hashed_password)
+        except (ValueError, TypeError):
+            return False, None
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
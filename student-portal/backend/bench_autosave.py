@@ -0,0 +1,208 @@
+"""
+Нагрузка на базу от автосохранений кода.
+
+Симулирует N студентов, у которых редактор присылает PATCH с полным кодом
+каждые --interval секунд (часть сохранений — без изменений, студент думает),
+и сравнивает два пути записи:
+
+    direct    — как было: crud.update_code_submission на каждое сохранение
+    buffered  — буфер автосохранения (crud.autosave)
+
+Печатает число сохранений, команд записи в базу и записанных документов
+в секунду. По умолчанию база — коллекция в памяти с задержкой --latency на
+команду (без истории ревизий и блобов); с --mongo-uri запись идёт в настоящую
+MongoDB (база autosave_bench), вместе с историей ревизий и блобами.
+
+    python bench_autosave.py --editors 30 --seconds 10
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from crud.autosave import AutosaveBuffer
+from crud.blobs import blob_store
+from crud.code_revisions import code_revisions
+from crud.student_code_submission import update_code_submission
+from models.student_code_submission import StudentCodeSubmissionUpdate
+
+
+class Counter:
+    def __init__(self):
+        self.commands = 0
+        self.documents = 0
+        self.reads = 0
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    return all(doc.get(field) == value for field, value in query.items())
+
+
+class MemoryCollection:
+    """Минимальная коллекция в памяти: только операции, которые нужны двум путям записи"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.docs = {}
+
+    async def _round_trip(self):
+        await asyncio.sleep(self.latency)
+
+    def _find(self, query: dict) -> Optional[dict]:
+        return next((doc for doc in self.docs.values() if _matches(doc, query)), None)
+
+    def _apply(self, query: dict, update: dict, upsert: bool) -> tuple:
+        doc = self._find(query)
+        if doc is None:
+            if not upsert:
+                return None, 0
+            doc = {"_id": ObjectId(), **query, **update.get("$setOnInsert", {})}
+            self.docs[doc["_id"]] = doc
+        changed = any(doc.get(k) != v for k, v in update.get("$set", {}).items())
+        doc.update(update.get("$set", {}))
+        return doc, int(changed)
+
+    async def find_one(self, query: dict, projection=None):
+        await self._round_trip()
+        doc = self._find(query)
+        return dict(doc) if doc else None
+
+    async def insert_one(self, doc: dict):
+        await self._round_trip()
+        doc = {"_id": ObjectId(), **doc}
+        self.docs[doc["_id"]] = doc
+        return type("InsertResult", (), {"inserted_id": doc["_id"]})()
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        await self._round_trip()
+        _, modified = self._apply(query, update, upsert)
+        return type("UpdateResult", (), {"modified_count": modified})()
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        await self._round_trip()
+        doc, _ = self._apply(query, update, upsert)
+        return dict(doc) if doc else None
+
+    async def bulk_write(self, operations, ordered=True):
+        await self._round_trip()
+        for op in operations:
+            self._apply(op._filter, op._doc, op._upsert)
+
+
+class CountingCollection:
+    """Обёртка, считающая команды записи и записанные документы"""
+
+    def __init__(self, collection, counter: Counter):
+        self._collection = collection
+        self._counter = counter
+
+    async def find_one(self, *args, **kwargs):
+        self._counter.reads += 1
+        return await self._collection.find_one(*args, **kwargs)
+
+    async def insert_one(self, doc, *args, **kwargs):
+        self._counter.commands += 1
+        self._counter.documents += 1
+        return await self._collection.insert_one(doc, *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        self._counter.commands += 1
+        self._counter.documents += 1
+        return await self._collection.update_one(*args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        self._counter.commands += 1
+        self._counter.documents += 1
+        return await self._collection.find_one_and_update(*args, **kwargs)
+
+    async def bulk_write(self, operations, *args, **kwargs):
+        self._counter.commands += 1
+        self._counter.documents += len(operations)
+        return await self._collection.bulk_write(operations, *args, **kwargs)
+
+
+async def editor(save, student_id: str, assignment_id: str, args, deadline: float) -> int:
+    code = "# solution\n"
+    saves = 0
+    # Редакторы стартуют вразнобой, как в реальном классе
+    await asyncio.sleep(random.uniform(0, args.interval))
+    while time.monotonic() < deadline:
+        if random.random() < args.typing:
+            code += f"print({random.randint(0, 1000)})\n"
+        await save(student_id, assignment_id, code)
+        saves += 1
+        await asyncio.sleep(args.interval)
+    return saves
+
+
+async def run(mode: str, collection, args) -> dict:
+    counter = Counter()
+    counted = CountingCollection(collection, counter)
+    buffer = AutosaveBuffer(lambda: counted, flush_interval=args.flush_interval)
+
+    async def save(student_id, assignment_id, code):
+        if mode == "direct":
+            await update_code_submission(counted, student_id, assignment_id, StudentCodeSubmissionUpdate(code=code))
+        else:
+            await buffer.save(student_id, assignment_id, code)
+
+    assignment_id = str(ObjectId())
+    started = time.monotonic()
+    deadline = started + args.seconds
+    saves = await asyncio.gather(*(
+        editor(save, f"{mode}-{i}", assignment_id, args, deadline) for i in range(args.editors)
+    ))
+    await buffer.stop()
+    elapsed = time.monotonic() - started
+    return {
+        "saves": sum(saves) / elapsed,
+        "commands": counter.commands / elapsed,
+        "documents": counter.documents / elapsed,
+        "reads": counter.reads / elapsed,
+    }
+
+
+async def main(args):
+    random.seed(args.seed)
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_uri)
+        collection = client.autosave_bench.student_assignment_code_submit
+        await client.autosave_bench.code_revisions.drop()
+        code_revisions._get_db = lambda: client.autosave_bench
+        blob_store._get_db = lambda: client.autosave_bench
+        await collection.drop()
+        await collection.create_index([("student_id", 1), ("assignment_id", 1)], unique=True)
+    else:
+        collection = MemoryCollection(args.latency)
+        # История ревизий и блобы пишутся только в настоящую MongoDB
+        code_revisions.enabled = False
+        blob_store.min_size = float("inf")
+
+    print(f"Редакторов: {args.editors}, автосохранение каждые {args.interval} с, "
+          f"изменений в {args.typing:.0%} сохранений, запись буфера раз в {args.flush_interval} с")
+    results = {}
+    for mode in ("direct", "buffered"):
+        results[mode] = await run(mode, collection, args)
+        r = results[mode]
+        print(f"{mode:<9} сохранений/с={r['saves']:.1f}  команд записи/с={r['commands']:.1f}  "
+              f"документов/с={r['documents']:.1f}  чтений/с={r['reads']:.1f}")
+    ratio = results["direct"]["commands"] / max(results["buffered"]["commands"], 1e-9)
+    print(f"Команд записи меньше в {ratio:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Записи в базу от автосохранений: direct / buffered")
+    parser.add_argument("--editors", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=0.5, help="период автосохранения редактора, с")
+    parser.add_argument("--typing", type=float, default=0.6, help="доля сохранений с изменённым кодом")
+    parser.add_argument("--flush-interval", type=float, default=2)
+    parser.add_argument("--latency", type=float, default=0.002, help="задержка команды коллекции в памяти, с")
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
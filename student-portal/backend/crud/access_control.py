@@ -0,0 +1,84 @@
+from bson import ObjectId
+from typing import Optional, Set
+import logging
+from crud.content_cache import ContentCache
+from crud.course_crud import db, lessons_collection, assignments_collection, enrollments_collection
+
+logger = logging.getLogger(__name__)
+
+# Отдельный кэш для проверок доступа, чтобы его статистика не смешивалась с контентом
+access_cache = ContentCache(lambda: db)
+
+
+class AccessControl:
+    """
+    Проверка доступа студента к курсу, уроку и заданию.
+
+    Хранит множество ID курсов студента и связи урок → курс, задание → урок.
+    Записи зависят от версий "enrollments:<student_id>", "lesson:<id>" и
+    "assignment:<id>", которые backend увеличивает при изменениях.
+    """
+
+    async def get_course_ids(self, student_id: str) -> Set[str]:
+        """Множество ID курсов, на которые записан студент"""
+        cache_key = f"enrollments:{student_id}"
+        cached = await access_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        course_ids = set()
+        cursor = enrollments_collection.find({"student_id": student_id}, {"course_id": 1, "_id": 0})
+        async for enrollment in cursor:
+            course_ids.add(str(enrollment["course_id"]))
+
+        access_cache.set(cache_key, course_ids, [f"enrollments:{student_id}"])
+        return course_ids
+
+    async def get_lesson_course_id(self, lesson_id: str) -> Optional[str]:
+        if not ObjectId.is_valid(lesson_id):
+            return None
+        cache_key = f"lesson_course:{lesson_id}"
+        cached = await access_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        lesson = await lessons_collection.find_one({"_id": ObjectId(lesson_id)}, {"course_id": 1})
+        if not lesson:
+            return None
+        course_id = str(lesson["course_id"])
+        access_cache.set(cache_key, course_id, [f"lesson:{lesson_id}"])
+        return course_id
+
+    async def get_assignment_lesson_id(self, assignment_id: str) -> Optional[str]:
+        if not ObjectId.is_valid(assignment_id):
+            return None
+        cache_key = f"assignment_lesson:{assignment_id}"
+        cached = await access_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        assignment = await assignments_collection.find_one({"_id": ObjectId(assignment_id)}, {"lesson_id": 1})
+        if not assignment or not assignment.get("lesson_id"):
+            return None
+        lesson_id = str(assignment["lesson_id"])
+        access_cache.set(cache_key, lesson_id, [f"assignment:{assignment_id}"])
+        return lesson_id
+
+    async def can_access_course(self, student_id: str, course_id: Optional[str]) -> bool:
+        if not course_id:
+            return False
+        return course_id in await self.get_course_ids(student_id)
+
+    async def can_access_lesson(self, student_id: str, lesson_id: str) -> bool:
+        course_id = await self.get_lesson_course_id(lesson_id)
+        return await self.can_access_course(student_id, course_id)
+
+    async def can_access_assignment(self, student_id: str, assignment_id: str) -> bool:
+        lesson_id = await self.get_assignment_lesson_id(assignment_id)
+        if lesson_id is None:
+            return False
+        return await self.can_access_lesson(student_id, lesson_id)
+
+
+# Создаем экземпляр класса для использования
+access_control = AccessControl()
@@ -0,0 +1,240 @@
+"""
+Буфер автосохранения кода студентов.
+
+Редактор присылает PATCH с полным кодом на каждое автосохранение. Буфер
+держит в памяти последнюю версию кода по (student_id, assignment_id) и пишет
+в student_assignment_code_submit пачками: раз в AUTOSAVE_FLUSH_INTERVAL
+секунд одним bulk_write, а также сразу при сдаче задания и при остановке
+приложения. Код, хеш которого не изменился, повторно не пишется. Каждая
+запись попадает ревизией в историю кода (crud/code_revisions.py).
+
+Первое сохранение ключа в процессе пишется в базу сразу — так известны _id
+и created_at записи для ответа. AUTOSAVE_FLUSH_INTERVAL=0 отключает буфер.
+
+Буфер у каждого процесса свой: при нескольких воркерах чтение в другом
+процессе видит код с задержкой до одного интервала записи.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from models.student_code_submission import StudentCodeSubmissionInDB
+from dependencies.database import db
+from crud.code_revisions import code_revisions
+from crud.blobs import blob_store
+import asyncio
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_FLUSH_INTERVAL = float(os.getenv("AUTOSAVE_FLUSH_INTERVAL", "2"))
+# При таком числе ожидающих ключей запись не ждёт таймера
+AUTOSAVE_MAX_PENDING = int(os.getenv("AUTOSAVE_MAX_PENDING", "1000"))
+# Сколько уже записанных ключей помнить (их _id, created_at и хеш кода)
+AUTOSAVE_KNOWN_SIZE = int(os.getenv("AUTOSAVE_KNOWN_SIZE", "10000"))
+
+Key = Tuple[str, str]
+
+
+def _digest(code: str) -> bytes:
+    return hashlib.blake2b(code.encode(), digest_size=16).digest()
+
+
+class AutosaveBuffer:
+    def __init__(
+        self,
+        get_collection: Callable,
+        flush_interval: float = AUTOSAVE_FLUSH_INTERVAL,
+        max_pending: int = AUTOSAVE_MAX_PENDING,
+        known_size: int = AUTOSAVE_KNOWN_SIZE
+    ):
+        self._get_collection = get_collection
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.known_size = known_size
+        # Ещё не записанный код: ключ -> {_id, created_at, code, digest, updated_at}
+        self._pending: Dict[Key, dict] = {}
+        # Код, который сейчас пишет flush(): до конца записи он новее, чем _known
+        self._flushing: Dict[Key, dict] = {}
+        # Состояние в базе: ключ -> {_id, created_at, digest, updated_at}
+        self._known: "OrderedDict[Key, dict]" = OrderedDict()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.saves = 0
+        self.skipped = 0
+        self.writes = 0
+        self.flushes = 0
+
+    async def save(self, student_id: str, assignment_id: str, code: str) -> StudentCodeSubmissionInDB:
+        """Принимает автосохранение и возвращает запись так, как она будет выглядеть в базе"""
+        self.saves += 1
+        key = (student_id, assignment_id)
+        digest = _digest(code)
+        state = self._pending.get(key) or self._flushing.get(key) or self._known.get(key)
+        if state is None:
+            return await self._write_through(key, code, digest)
+
+        if digest == state["digest"]:
+            self.skipped += 1
+            return self._model(key, state, code)
+
+        if self.flush_interval <= 0:
+            return await self._write_through(key, code, digest)
+
+        entry = {
+            "_id": state["_id"],
+            "created_at": state["created_at"],
+            "code": code,
+            "digest": digest,
+            "updated_at": datetime.utcnow()
+        }
+        self._pending[key] = entry
+        self._ensure_task()
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+        return self._model(key, entry, code)
+
+    def peek(self, student_id: str, assignment_id: str) -> Optional[dict]:
+        """Ещё не записанный код ключа ({code, updated_at}) — чтобы чтение видело последнее автосохранение"""
+        key = (student_id, assignment_id)
+        entry = self._pending.get(key) or self._flushing.get(key)
+        if entry is None:
+            return None
+        return {"code": entry["code"], "updated_at": entry["updated_at"]}
+
+    async def flush(self, keys: Optional[Iterable[Key]] = None) -> int:
+        """Записывает ожидающий код (весь или только по keys) одним bulk_write; возвращает число записей"""
+        async with self._flush_lock:
+            if keys is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {key: self._pending.pop(key) for key in keys if key in self._pending}
+            if not batch:
+                return 0
+            self._flushing = batch
+
+            try:
+                # Большой код — в блобы одной пачкой, в документе остаётся ссылка
+                large = [entry["code"] for entry in batch.values() if blob_store.is_large(entry["code"])]
+                refs = dict(zip(large, await blob_store.put_many(large))) if large else {}
+                operations = []
+                for (student_id, assignment_id), entry in batch.items():
+                    code = entry["code"]
+                    if code in refs:
+                        code_fields, unset_fields = {"code_ref": refs[code], "code_size": len(code)}, {"code": ""}
+                    else:
+                        code_fields, unset_fields = {"code": code}, {"code_ref": "", "code_size": ""}
+                    operations.append(UpdateOne(
+                        {"student_id": student_id, "assignment_id": assignment_id},
+                        {
+                            "$set": {**code_fields, "updated_at": entry["updated_at"]},
+                            "$unset": unset_fields,
+                            "$setOnInsert": {"created_at": entry["created_at"]}
+                        },
+                        upsert=True
+                    ))
+                await self._get_collection().bulk_write(operations, ordered=False)
+            except Exception as e:
+                # Возвращаем в очередь то, что не успели перезаписать новые сохранения
+                for key, entry in batch.items():
+                    self._pending.setdefault(key, entry)
+                logger.error(f"Failed to flush {len(batch)} autosaved code submissions: {e}")
+                return 0
+            finally:
+                self._flushing = {}
+
+            self.flushes += 1
+            self.writes += len(batch)
+            for key, entry in batch.items():
+                self._remember(key, entry)
+            await code_revisions.record_many([
+                (student_id, assignment_id, entry["code"], entry["updated_at"])
+                for (student_id, assignment_id), entry in batch.items()
+            ])
+            return len(batch)
+
+    async def flush_student_assignment(self, student_id: str, assignment_id: str) -> None:
+        """Принудительная запись перед сдачей задания"""
+        await self.flush([(student_id, assignment_id)])
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _write_through(self, key: Key, code: str, digest: bytes) -> StudentCodeSubmissionInDB:
+        student_id, assignment_id = key
+        # Более раннее несохранённое автосохранение этого ключа перекрывается текущим
+        self._pending.pop(key, None)
+        now = datetime.utcnow()
+        code_fields, unset_fields = await blob_store.fields("code", code)
+        doc = await self._get_collection().find_one_and_update(
+            {"student_id": student_id, "assignment_id": assignment_id},
+            {
+                "$set": {**code_fields, "updated_at": now},
+                "$unset": unset_fields,
+                "$setOnInsert": {"created_at": now}
+            },
+            projection={"_id": 1, "created_at": 1, "updated_at": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.writes += 1
+        await code_revisions.record(student_id, assignment_id, code, at=doc["updated_at"])
+        state = {"_id": doc["_id"], "created_at": doc["created_at"], "digest": digest, "updated_at": doc["updated_at"]}
+        self._remember(key, state)
+        return self._model(key, state, code)
+
+    def _remember(self, key: Key, entry: dict) -> None:
+        self._known[key] = {
+            "_id": entry["_id"],
+            "created_at": entry["created_at"],
+            "digest": entry["digest"],
+            "updated_at": entry["updated_at"]
+        }
+        self._known.move_to_end(key)
+        while len(self._known) > self.known_size:
+            self._known.popitem(last=False)
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Autosave flush failed: {e}")
+
+    @staticmethod
+    def _model(key: Key, state: dict, code: str) -> StudentCodeSubmissionInDB:
+        student_id, assignment_id = key
+        return StudentCodeSubmissionInDB(
+            _id=str(state["_id"]),
+            student_id=student_id,
+            assignment_id=assignment_id,
+            code=code,
+            created_at=state["created_at"],
+            updated_at=state["updated_at"]
+        )
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "saves": self.saves,
+            "skipped": self.skipped,
+            "writes": self.writes,
+            "flushes": self.flushes
+        }
+
+
+autosave_buffer = AutosaveBuffer(lambda: db.student_assignment_code_submit)
@@ -0,0 +1,118 @@
+# Сгенерировано из backend/crud/content_cache.py скриптом backend/sync_shared.py — правьте оригинал
+# Общий с student portal модуль: после правки обновите копию — python sync_shared.py
+from collections import OrderedDict
+from pymongo import ReturnDocument
+from typing import Any, Callable, Dict, Iterable, Optional
+import asyncio
+import copy
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CONTENT_CACHE_SIZE = int(os.getenv("CONTENT_CACHE_SIZE", "2048"))
+# Как часто подтягивать версии, изменённые другими процессами (в секундах)
+CONTENT_CACHE_SYNC_INTERVAL = float(os.getenv("CONTENT_CACHE_SYNC_INTERVAL", "5"))
+
+
+class ContentCache:
+    """
+    Кэш контента курсов (курсы, уроки, задания) в памяти процесса.
+
+    Каждая запись помнит версии сущностей, из которых она собрана
+    ("course:<id>", "lesson:<id>", "assignment:<id>"). Запись на изменение
+    увеличивает версию сущности, и все зависящие от неё записи становятся
+    недействительными. Версии хранятся в коллекции content_versions, поэтому
+    изменения из backend видны и student portal (с задержкой до sync_interval).
+    """
+
+    def __init__(
+        self,
+        get_db: Callable,
+        maxsize: int = CONTENT_CACHE_SIZE,
+        sync_interval: float = CONTENT_CACHE_SYNC_INTERVAL
+    ):
+        self._get_db = get_db
+        self.maxsize = maxsize
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._synced_at = 0.0
+        self._last_seen = None
+        self._sync_lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        await self._maybe_sync()
+        entry = self._entries.get(key)
+        if entry is not None:
+            deps, value, expires_at = entry
+            fresh = expires_at is None or time.monotonic() < expires_at
+            if fresh and all(self._versions.get(entity, 0) == version for entity, version in deps.items()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, depends_on: Iterable[str], ttl: Optional[float] = None) -> None:
+        """Сохраняет значение; ttl дополнительно ограничивает время жизни записи (в секундах)"""
+        if value is None or self.maxsize <= 0:
+            return
+        deps = {entity: self._versions.get(entity, 0) for entity in depends_on}
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (deps, copy.deepcopy(value), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def bump(self, *entities: str) -> None:
+        """Отмечает сущности изменёнными: локально сразу, для других процессов — через базу"""
+        collection = self._get_db().content_versions
+        for entity in entities:
+            self._versions[entity] = self._versions.get(entity, 0) + 1
+            try:
+                doc = await collection.find_one_and_update(
+                    {"_id": entity},
+                    {"$inc": {"version": 1}, "$currentDate": {"updated_at": True}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                self._versions[entity] = max(self._versions[entity], doc["version"])
+            except Exception as e:
+                logger.error(f"Failed to publish content version for {entity}: {e}")
+
+    async def _maybe_sync(self) -> None:
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        async with self._sync_lock:
+            if time.monotonic() - self._synced_at < self.sync_interval:
+                return
+            query = {"updated_at": {"$gte": self._last_seen}} if self._last_seen else {}
+            try:
+                async for doc in self._get_db().content_versions.find(query):
+                    entity = doc["_id"]
+                    self._versions[entity] = max(self._versions.get(entity, 0), doc["version"])
+                    if self._last_seen is None or doc["updated_at"] > self._last_seen:
+                        self._last_seen = doc["updated_at"]
+            except Exception as e:
+                logger.warning(f"Failed to sync content versions: {e}")
+            self._synced_at = time.monotonic()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
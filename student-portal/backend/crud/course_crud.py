@@ -5,6 +5,8 @@ from fastapi import HTTPException
 from typing import List, Optional, Dict, Any
 import os
 import logging
+from crud.content_cache import ContentCache
+from crud.blobs import blob_store
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +37,29 @@ except Exception as e:
     assignments_collection = None
     enrollments_collection = None
 
+# Кэш контента: курсы, уроки и задания меняются редко, а читаются на каждой странице
+content_cache = ContentCache(lambda: db)
+
+
+def _assignment_data(assignment: dict) -> Dict[str, Any]:
+    data = {
+        "id": str(assignment["_id"]),
+        "_id": str(assignment["_id"]),  # Добавляем _id для фронтенда
+        "title": assignment.get("title", ""),
+        "description": assignment.get("description", ""),
+        "lesson_id": str(assignment.get("lesson_id", "")),
+        "created_at": assignment.get("created_at", ""),
+        "updated_at": assignment.get("updated_at", "")
+    }
+    # Большой шаблон хранится блобом: в списках отдаём ссылку, текст — только в задании по ID
+    if assignment.get("code_editor_ref"):
+        data["code_editor_ref"] = assignment["code_editor_ref"]
+        data["code_editor_size"] = assignment.get("code_editor_size")
+    else:
+        data["code_editor"] = assignment.get("code_editor", "")
+    return data
+
+
 class CourseCRUD:
     async def get_student_courses(self, student_id: str) -> List[Dict[str, Any]]:
         """Получает список курсов, на которые записан студент"""
@@ -86,6 +111,11 @@ class CourseCRUD:
             if not ObjectId.is_valid(course_id):
                 raise HTTPException(status_code=400, detail="Неверный формат ID курса")
             
+            cache_key = f"course_page:{course_id}"
+            cached = await content_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             # Получаем курс
             course = await courses_collection.find_one({"_id": ObjectId(course_id)})
             if not course:
@@ -114,7 +144,7 @@ class CourseCRUD:
             logger.info(f"Всего найдено {len(lessons)} уроков для курса {course_id}")
 
             # Возвращаем курс вместе с уроками
-            return {
+            result = {
                 "_id": str(course["_id"]),
                 "title": course.get("title", ""),
                 "description": course.get("description", ""),
@@ -125,6 +155,9 @@ class CourseCRUD:
                 "id": str(course["_id"]),
                 "lessons": lessons  # Используем только уроки из коллекции lessons
             }
+            depends_on = [f"course:{course_id}"] + [f"lesson:{lesson['id']}" for lesson in lessons]
+            content_cache.set(cache_key, result, depends_on)
+            return result
         except Exception as e:
             logger.error(f"Ошибка при получении курса по ID {course_id}: {e}")
             return None
@@ -135,6 +168,11 @@ class CourseCRUD:
             if not ObjectId.is_valid(course_id):
                 raise HTTPException(status_code=400, detail="Неверный формат ID курса")
             
+            cache_key = f"course_lessons:{course_id}"
+            cached = await content_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             logger.info(f"Получение уроков для курса с ID: {course_id}")
             lessons = []
             
@@ -150,6 +188,7 @@ class CourseCRUD:
                 lessons.append(lesson_data)
             
             logger.info(f"Найдено {len(lessons)} уроков для курса {course_id}")
+            content_cache.set(cache_key, lessons, [f"course:{course_id}"])
             return lessons
             
         except Exception as e:
@@ -162,6 +201,11 @@ class CourseCRUD:
             if not ObjectId.is_valid(lesson_id):
                 raise HTTPException(status_code=400, detail="Неверный формат ID урока")
             
+            cache_key = f"lesson:{lesson_id}"
+            cached = await content_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             lesson = await lessons_collection.find_one({"_id": ObjectId(lesson_id)})
             if not lesson:
                 return None
@@ -174,6 +218,7 @@ class CourseCRUD:
                 "order": lesson.get("order", 0),
                 "course_id": str(lesson["course_id"]),
             }
+            content_cache.set(cache_key, lesson_data, [f"lesson:{lesson_id}"])
             return lesson_data
         except Exception as e:
             logger.error(f"Ошибка при получении урока по ID {lesson_id}: {e}")
@@ -185,6 +230,11 @@ class CourseCRUD:
             if not ObjectId.is_valid(lesson_id):
                 raise HTTPException(status_code=400, detail="Неверный формат ID урока")
             
+            cache_key = f"lesson_assignments:{lesson_id}"
+            cached = await content_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             logger.info(f"Получение заданий для урока с ID: {lesson_id}")
             assignments = []
             
@@ -194,46 +244,52 @@ class CourseCRUD:
             
             async for assignment in cursor:
                 logger.info(f"Найдено задание: {assignment}")
-                assignment_data = {
-                    "id": str(assignment["_id"]),
-                    "_id": str(assignment["_id"]),  # Добавляем _id для фронтенда
-                    "title": assignment.get("title", ""),
-                    "description": assignment.get("description", ""),
-                    "code_editor": assignment.get("code_editor", ""),
-                    "lesson_id": str(assignment.get("lesson_id", "")),
-                    "created_at": assignment.get("created_at", ""),
-                    "updated_at": assignment.get("updated_at", "")
-                }
-                assignments.append(assignment_data)
+                assignments.append(_assignment_data(assignment))
             
             logger.info(f"Всего найдено {len(assignments)} заданий для урока {lesson_id}")
+            content_cache.set(cache_key, assignments, [f"lesson:{lesson_id}"])
             return assignments
         except Exception as e:
             logger.error(f"Ошибка при получении заданий урока {lesson_id}: {e}")
             return []
     
+    async def get_course_assignments(self, course_id: str, lesson_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Задания всех уроков курса одним $in-запросом: {lesson_id: [задания]}"""
+        cache_key = f"course_assignments:{course_id}"
+        cached = await content_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        by_lesson = {lesson_id: [] for lesson_id in lesson_ids}
+        object_ids = [ObjectId(lesson_id) for lesson_id in lesson_ids if ObjectId.is_valid(lesson_id)]
+        if object_ids:
+            async for assignment in assignments_collection.find({"lesson_id": {"$in": object_ids}}).sort("_id", 1):
+                assignment_data = _assignment_data(assignment)
+                by_lesson.setdefault(assignment_data["lesson_id"], []).append(assignment_data)
+
+        depends_on = [f"course:{course_id}"] + [f"lesson:{lesson_id}" for lesson_id in lesson_ids]
+        content_cache.set(cache_key, by_lesson, depends_on)
+        return by_lesson
+
     async def get_assignment_by_id(self, assignment_id: str) -> Optional[Dict[str, Any]]:
         """Получает информацию о задании по его ID"""
         try:
             if not ObjectId.is_valid(assignment_id):
                 raise HTTPException(status_code=400, detail="Неверный формат ID задания")
             
+            cache_key = f"assignment:{assignment_id}"
+            cached = await content_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             assignment = await assignments_collection.find_one({"_id": ObjectId(assignment_id)})
             if not assignment:
                 return None
             
-            assignment_data = {
-                "id": str(assignment["_id"]),
-                "_id": str(assignment["_id"]),
-                "title": assignment.get("title", ""),
-                "description": assignment.get("description", ""),
-                "code_editor": assignment.get("code_editor", ""),
-                "lesson_id": str(assignment.get("lesson_id", "")),
-                "created_at": assignment.get("created_at", ""),
-                "updated_at": assignment.get("updated_at", "")
-            }
+            assignment_data = await blob_store.load(_assignment_data(assignment), "code_editor")
             
             logger.info(f"Получено задание: {assignment_data}")
+            content_cache.set(cache_key, assignment_data, [f"assignment:{assignment_id}"])
             return assignment_data
         except Exception as e:
             logger.error(f"Ошибка при получении задания по ID {assignment_id}: {e}")
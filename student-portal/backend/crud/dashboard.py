@@ -0,0 +1,112 @@
+"""
+Страница курса для студента одним запросом.
+
+Контент (курс, уроки, задания) берётся из content_cache, состояние студента —
+тремя параллельными $in-запросами по заданиям курса: отметки о сдаче,
+метаданные кода и оценки. Число запросов не зависит от количества уроков.
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+from crud.course_crud import course_crud, db
+
+
+async def _get_submissions(student_id: str, assignment_ids: List[str]) -> Dict[str, dict]:
+    submissions = {}
+    cursor = db.student_assignment_submit.find(
+        {"student_id": student_id, "assignment_id": {"$in": assignment_ids}},
+        {"assignment_id": 1, "is_submitted": 1, "submit_date": 1, "updated_at": 1}
+    )
+    async for submission in cursor:
+        submissions[submission["assignment_id"]] = {
+            "id": str(submission["_id"]),
+            "is_submitted": submission.get("is_submitted", False),
+            "submit_date": submission.get("submit_date"),
+            "updated_at": submission.get("updated_at")
+        }
+    return submissions
+
+
+async def _get_code(student_id: str, assignment_ids: List[str]) -> Dict[str, dict]:
+    """Только метаданные последней версии кода: сам код на странице курса не нужен"""
+    code = {}
+    cursor = db.student_assignment_code_submit.aggregate([
+        {"$match": {"student_id": student_id, "assignment_id": {"$in": assignment_ids}}},
+        {"$project": {
+            "assignment_id": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            # Код, вынесенный в блоб, хранит длину в code_size
+            "size": {"$ifNull": ["$code_size", {"$strLenCP": {"$ifNull": ["$code", ""]}}]}
+        }}
+    ])
+    async for submission in cursor:
+        code[submission["assignment_id"]] = {
+            "id": str(submission["_id"]),
+            "size": submission["size"],
+            "created_at": submission.get("created_at"),
+            "updated_at": submission.get("updated_at")
+        }
+    return code
+
+
+async def _get_grades(student_id: str, assignment_ids: List[str]) -> Dict[str, dict]:
+    grades = {}
+    # Если оценок несколько, остаётся последняя
+    cursor = db.grades.find(
+        {"student_id": student_id, "assignment_id": {"$in": assignment_ids}},
+        {"assignment_id": 1, "grade": 1, "updated_at": 1}
+    ).sort("updated_at", 1)
+    async for grade in cursor:
+        grades[grade["assignment_id"]] = {
+            "id": str(grade["_id"]),
+            "grade": grade.get("grade"),
+            "updated_at": grade.get("updated_at")
+        }
+    return grades
+
+
+def _progress(assignments: List[dict]) -> Dict[str, int]:
+    return {
+        "assignments": len(assignments),
+        "submitted": sum(1 for a in assignments if a["submission"] and a["submission"]["is_submitted"]),
+        "graded": sum(1 for a in assignments if a["grade"] is not None)
+    }
+
+
+async def get_course_dashboard(student_id: str, course_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Курс с уроками; у каждого задания — submission, code и grade студента
+    (None, если нет), у уроков и курса — сводка progress.
+    """
+    course = await course_crud.get_course_by_id(course_id)
+    if not course:
+        return None
+
+    lesson_ids = [lesson["id"] for lesson in course["lessons"]]
+    assignments_by_lesson = await course_crud.get_course_assignments(course_id, lesson_ids)
+    assignment_ids = [a["id"] for items in assignments_by_lesson.values() for a in items]
+
+    submissions, code, grades = {}, {}, {}
+    if assignment_ids:
+        submissions, code, grades = await asyncio.gather(
+            _get_submissions(student_id, assignment_ids),
+            _get_code(student_id, assignment_ids),
+            _get_grades(student_id, assignment_ids)
+        )
+
+    # Закэшированные словари не меняем — собираем новые
+    lessons, all_assignments = [], []
+    for lesson in course["lessons"]:
+        assignments = [
+            {
+                **assignment,
+                "submission": submissions.get(assignment["id"]),
+                "code": code.get(assignment["id"]),
+                "grade": grades.get(assignment["id"])
+            }
+            for assignment in assignments_by_lesson.get(lesson["id"], [])
+        ]
+        all_assignments.extend(assignments)
+        lessons.append({**lesson, "assignments": assignments, "progress": _progress(assignments)})
+
+    return {**course, "lessons": lessons, "progress": _progress(all_assignments)}
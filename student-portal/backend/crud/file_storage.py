@@ -0,0 +1,193 @@
+"""
+Файлы, загружаемые студентами (скриншоты, приложения к заданиям).
+
+Весь дисковый ввод-вывод идёт в отдельном пуле потоков FILES_IO_WORKERS,
+поэтому одновременные загрузки не блокируют event loop, а размер пула
+ограничивает нагрузку на диск. Загрузка пишется кусками во временный файл
+.<uuid>.part с подсчётом sha256 по ходу записи; при превышении
+FILES_MAX_UPLOAD_SIZE запись обрывается и временный файл удаляется. Готовый
+файл атомарно переименовывается в <uuid><расширение>, поэтому читатели
+никогда не видят недописанный файл.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import hashlib
+import logging
+import os
+import stat
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+FILES_MAX_UPLOAD_SIZE = int(os.getenv("FILES_MAX_UPLOAD_SIZE", str(20 * 1024 * 1024)))
+FILES_IO_WORKERS = int(os.getenv("FILES_IO_WORKERS", "8"))
+# Размер куска записи на диск и чтения при отдаче файла
+FILES_CHUNK_SIZE = int(os.getenv("FILES_CHUNK_SIZE", str(256 * 1024)))
+# Недописанные файлы старше этого возраста (в секундах) остались от упавшего процесса
+FILES_STALE_UPLOAD_AGE = 3600
+
+TEMP_SUFFIX = ".part"
+
+
+class FileTooLargeError(ValueError):
+    pass
+
+
+class UploadWriter:
+    """Запись одной загрузки во временный файл; commit() публикует её под итоговым именем"""
+
+    def __init__(self, storage: "FileStorage", extension: str):
+        file_id = uuid.uuid4()
+        self._storage = storage
+        self.filename = f"{file_id}{extension}"
+        self.path = os.path.join(storage.directory, self.filename)
+        self._temp_path = os.path.join(storage.directory, f".{file_id}{TEMP_SUFFIX}")
+        self._file = None
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self.size = 0
+        self.committed = False
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self._storage.max_size:
+            raise FileTooLargeError(f"File is larger than {self._storage.max_size} bytes")
+        # Мелкие куски из сети копим, в поток отдаём не меньше chunk_size за раз
+        self._buffer += data
+        if len(self._buffer) >= self._storage.chunk_size:
+            await self._flush()
+
+    async def commit(self) -> dict:
+        await self._flush()
+        await self._storage.run(self._publish)
+        self.committed = True
+        return {"filename": self.filename, "path": self.path, "size": self.size, "sha256": self._hash.hexdigest()}
+
+    async def abort(self) -> None:
+        await self._storage.run(self._discard)
+
+    async def _flush(self) -> None:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        await self._storage.run(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        if self._file is None:
+            self._file = open(self._temp_path, "xb")
+        # sha256 отпускает GIL на больших кусках, считаем его в том же потоке
+        self._hash.update(data)
+        self._file.write(data)
+
+    def _publish(self) -> None:
+        if self._file is None:
+            self._file = open(self._temp_path, "xb")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def _discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        try:
+            os.remove(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class FileStorage:
+    def __init__(
+        self,
+        directory: str = UPLOAD_DIR,
+        max_size: int = FILES_MAX_UPLOAD_SIZE,
+        chunk_size: int = FILES_CHUNK_SIZE,
+        max_workers: int = FILES_IO_WORKERS
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="file-io")
+        os.makedirs(directory, exist_ok=True)
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    @asynccontextmanager
+    async def upload(self, extension: str) -> AsyncIterator[UploadWriter]:
+        """Временный файл удаляется, если блок завершился без commit() (ошибка, обрыв, превышение размера)"""
+        writer = UploadWriter(self, extension)
+        try:
+            yield writer
+        finally:
+            if not writer.committed:
+                await writer.abort()
+
+    def path(self, filename: str) -> Optional[str]:
+        """Путь к загруженному файлу; None для имён вне каталога и временных файлов"""
+        if not filename or filename != os.path.basename(filename) or filename.startswith("."):
+            return None
+        return os.path.join(self.directory, filename)
+
+    async def stat(self, filename: str) -> Optional[os.stat_result]:
+        path = self.path(filename)
+        if path is None:
+            return None
+        try:
+            result = await self.run(os.stat, path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return result if stat.S_ISREG(result.st_mode) else None
+
+    async def read(self, filename: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Байты файла с start по end включительно, кусками по chunk_size"""
+        file = await self.run(open, self.path(filename), "rb")
+        try:
+            offset = start
+            while offset <= end:
+                data = await self.run(self._read_at, file, offset, min(self.chunk_size, end - offset + 1))
+                if not data:
+                    break
+                offset += len(data)
+                yield data
+        finally:
+            await self.run(file.close)
+
+    @staticmethod
+    def _read_at(file, offset: int, size: int) -> bytes:
+        # seek + read вместо os.pread: pread есть только в Unix
+        file.seek(offset)
+        return file.read(size)
+
+    async def delete(self, filename: str) -> bool:
+        path = self.path(filename)
+        if path is None:
+            return False
+        try:
+            await self.run(os.remove, path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def remove_stale_uploads(self) -> int:
+        """Удаляет временные файлы загрузок, оборванных падением процесса"""
+        return await self.run(self._remove_stale_uploads)
+
+    def _remove_stale_uploads(self) -> int:
+        removed = 0
+        deadline = time.time() - FILES_STALE_UPLOAD_AGE
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") and entry.name.endswith(TEMP_SUFFIX):
+                    try:
+                        if entry.stat().st_mtime < deadline:
+                            os.remove(entry.path)
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+
+file_storage = FileStorage()
@@ -3,6 +3,8 @@ from typing import List, Optional, Dict, Any
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
 from models.student_code_submission import StudentCodeSubmissionCreate, StudentCodeSubmissionUpdate, StudentCodeSubmissionInDB
+from crud.code_revisions import code_revisions
+from crud.blobs import blob_store
 
 async def create_code_submission(
     collection: AsyncIOMotorCollection,
@@ -13,8 +15,11 @@ async def create_code_submission(
     code_dict["created_at"] = datetime.utcnow()
     code_dict["updated_at"] = datetime.utcnow()
     
+    await blob_store.pack(code_dict, "code")
+    
     result = await collection.insert_one(code_dict)
-    created_code = await collection.find_one({"_id": result.inserted_id})
+    await code_revisions.record(code_data.student_id, code_data.assignment_id, code_data.code, at=code_dict["updated_at"])
+    created_code = await blob_store.load(await collection.find_one({"_id": result.inserted_id}), "code")
     
     if created_code and "_id" in created_code:
         created_code["_id"] = str(created_code["_id"])
@@ -27,7 +32,7 @@ async def get_code_submission(
 ) -> Optional[StudentCodeSubmissionInDB]:
     """Получение записи кода по ID"""
     try:
-        submission = await collection.find_one({"_id": ObjectId(submission_id)})
+        submission = await blob_store.load(await collection.find_one({"_id": ObjectId(submission_id)}), "code")
         if submission:
             return StudentCodeSubmissionInDB.from_mongo(submission)
     except Exception as e:
@@ -42,10 +47,10 @@ async def get_student_assignment_code(
 ) -> Optional[StudentCodeSubmissionInDB]:
     """Получение кода студента для конкретного задания"""
     try:
-        submission = await collection.find_one({
+        submission = await blob_store.load(await collection.find_one({
             "student_id": student_id,
             "assignment_id": assignment_id
-        })
+        }), "code")
         if submission:
             return StudentCodeSubmissionInDB.from_mongo(submission)
     except Exception as e:
@@ -73,11 +78,18 @@ async def update_code_submission(
             
             if existing:
                 # Обновляем существующую запись
+                update = {"$set": update_data}
+                if "code" in update_data:
+                    code_fields, unset_fields = await blob_store.fields("code", update_data.pop("code"))
+                    update_data.update(code_fields)
+                    update["$unset"] = unset_fields
                 result = await collection.update_one(
                     {"_id": existing["_id"]},
-                    {"$set": update_data}
+                    update
                 )
                 if result.modified_count:
+                    if code_data.code is not None:
+                        await code_revisions.record(student_id, assignment_id, code_data.code, at=update_data["updated_at"])
                     return await get_code_submission(collection, str(existing["_id"]))
             else:
                 # Создаем новую запись
@@ -6,15 +6,16 @@ from fastapi import HTTPException
 from datetime import datetime
 from typing import Optional, List
 import os
-from passlib.context import CryptContext
 import logging
+from crud.access_control import access_cache, access_control
+from auth.passwords import password_hasher
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Настройка хеширования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Сколько секунд профиль студента из токена живёт в кэше сессий
+STUDENT_SESSION_TTL = int(os.getenv("STUDENT_SESSION_TTL", "60"))
 
 # Подключение к MongoDB
 username = urllib.parse.quote_plus("vitaliipodgornii")
@@ -38,17 +39,13 @@ except Exception as e:
     enrollments_collection = None
 
 class StudentCRUD:
-    def verify_password(self, plain_password, hashed_password):
+    async def verify_password(self, plain_password, hashed_password):
         """Проверяет, соответствует ли plaintext пароль хешированному паролю."""
-        try:
-            return pwd_context.verify(plain_password, hashed_password)
-        except Exception as e:
-            logger.error(f"Ошибка проверки пароля: {e}")
-            return False
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password):
+    async def get_password_hash(self, password):
         """Создает хеш пароля для безопасного хранения."""
-        return pwd_context.hash(password)
+        return await password_hasher.hash(password)
 
     async def authenticate_student(self, username: str, password: str) -> Optional[StudentInDB]:
         """Аутентифицирует студента по имени пользователя и паролю."""
@@ -61,9 +58,18 @@ class StudentCRUD:
                 return None
                 
             logger.info(f"Студент найден, проверяем пароль")
-            if not self.verify_password(password, student.get("hashed_password")):
+            valid, new_hash = await password_hasher.verify_and_update(password, student.get("hashed_password"))
+            if not valid:
                 logger.warning(f"Неверный пароль для студента {username}")
                 return None
+
+            # Стоимость bcrypt изменилась — пересохраняем хеш с новой стоимостью
+            if new_hash:
+                await students_collection.update_one(
+                    {"_id": student["_id"], "hashed_password": student.get("hashed_password")},
+                    {"$set": {"hashed_password": new_hash}}
+                )
+                student["hashed_password"] = new_hash
             
             # Приводим поля из базы данных к ожидаемому формату модели
             # Важно: в базе данных поле называется "hashed_password", 
@@ -145,6 +151,38 @@ class StudentCRUD:
             logger.error(f"Ошибка при получении студента по ID {student_id}: {e}")
             return None
 
+    async def get_student_session(self, student_id: str) -> Optional[StudentInDB]:
+        """
+        Студент для аутентифицированного запроса.
+        Профиль берётся из кэша сессий (до STUDENT_SESSION_TTL секунд или до изменения
+        студента), а список курсов — из индекса доступа, который сбрасывается при
+        изменении записей на курсы. Обычно запрос к базе не нужен.
+        """
+        cache_key = f"session:{student_id}"
+        student = await access_cache.get(cache_key)
+        if student is None:
+            if not ObjectId.is_valid(student_id):
+                return None
+            doc = await students_collection.find_one({"_id": ObjectId(student_id)})
+            if not doc:
+                return None
+            student = StudentInDB(
+                id=str(doc["_id"]),
+                username=doc["username"],
+                first_name=doc.get("first_name", ""),
+                last_name=doc.get("last_name", ""),
+                email=doc.get("email", ""),
+                phone=doc.get("phone", ""),
+                comment=doc.get("comment", None),
+                created_at=doc.get("created_at", datetime.utcnow()),
+                updated_at=doc.get("updated_at", datetime.utcnow()),
+                password_hash=doc.get("hashed_password", "")
+            )
+            access_cache.set(cache_key, student, [f"student:{student_id}"], ttl=STUDENT_SESSION_TTL)
+
+        student.course_ids = sorted(await access_control.get_course_ids(student_id))
+        return student
+
     async def get_student_courses(self, student_id: str) -> List[str]:
         """Получает список ID курсов, на которые записан студент"""
         try:
@@ -168,7 +206,7 @@ class StudentCRUD:
             # Если пароль обновляется, хешируем его
             if "password" in update_dict:
                 password = update_dict.pop("password")
-                update_dict["hashed_password"] = self.get_password_hash(password)
+                update_dict["hashed_password"] = await self.get_password_hash(password)
             
             if update_dict:
                 update_dict["updated_at"] = datetime.utcnow()
@@ -176,6 +214,7 @@ class StudentCRUD:
                     {"_id": ObjectId(student_id)},
                     {"$set": update_dict}
                 )
+                await access_cache.bump(f"student:{student_id}")
             
             return await self.get_student_by_id(student_id)
         except Exception as e:
@@ -1,11 +1,8 @@
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
-from bson import ObjectId
-from datetime import datetime
-from fastapi.encoders import jsonable_encoder
-import json
 
 # Импортируем роутеры
 from api.auth import router as auth_router
@@ -18,20 +15,25 @@ from api.courses import router as courses_router
 from api.lessons import router as lessons_router
 from api.assignments import router as assignments_router
 from api.files import router as files_router
+from crud.course_crud import content_cache
+from crud.access_control import access_cache
+from crud.autosave import autosave_buffer
+from crud.file_storage import file_storage
+from api.responses import FastJSONResponse
 
 # Загружаем переменные окружения
 load_dotenv()
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Временные файлы загрузок, оборванных прошлым запуском
+    await file_storage.remove_stale_uploads()
+    yield
+    # Дописываем в базу код из буфера автосохранения
+    await autosave_buffer.stop()
 
-# Создаем экземпляр FastAPI
-app = FastAPI(title="Student Portal API")
+# Создаем экземпляр FastAPI (orjson для всех ответов, ObjectId и datetime — без отдельного encoder)
+app = FastAPI(title="Student Portal API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Настраиваем CORS для frontend
 app.add_middleware(
@@ -42,16 +44,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Переопределяем стандартный JSON encoder для FastAPI
-def custom_encoder(obj):
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    return obj
-
-app.json_encoder = CustomJSONEncoder
-
 # Подключаем роутеры
 app.include_router(auth_router)
 # app.include_router(student_assignment_submit_router)
@@ -69,6 +61,16 @@ app.include_router(files_router)
 async def health_check():
     return {"status": "Student Portal API is running!"}
 
+# Статистика попаданий в кэш контента курсов
+@app.get("/metrics/cache")
+async def cache_metrics():
+    return {"content": content_cache.stats(), "access": access_cache.stats()}
+
+# Автосохранения кода: сколько принято, пропущено без изменений и записано в базу
+@app.get("/metrics/autosave")
+async def autosave_metrics():
+    return autosave_buffer.stats()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Student Portal API"}
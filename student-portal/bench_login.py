@@ -0,0 +1,73 @@
+"""
+Нагрузочная проверка логина student portal.
+
+Отправляет пачку одновременных POST /auth/login и параллельно опрашивает /health.
+Если хеширование паролей блокирует event loop, задержка /health растёт
+вместе с числом одновременных логинов.
+
+    python bench_login.py --username student --password secret --concurrency 20 --requests 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str, latencies: list):
+    started = time.perf_counter()
+    response = await client.post("/auth/login", data={"username": username, "password": password})
+    latencies.append(time.perf_counter() - started)
+    return response.status_code
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        login_latencies, health_latencies = [], []
+        semaphore = asyncio.Semaphore(args.concurrency)
+        stop = asyncio.Event()
+
+        async def limited_login():
+            async with semaphore:
+                return await login(client, args.username, args.password, login_latencies)
+
+        probe = asyncio.create_task(probe_health(client, stop, health_latencies))
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(limited_login() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    print(f"Логинов: {len(statuses)}, успешных: {statuses.count(200)}, за {elapsed:.2f} с "
+          f"({len(statuses) / elapsed:.1f} в секунду)")
+    print(f"/auth/login  p50={percentile(login_latencies, 0.5):.0f} мс  "
+          f"p95={percentile(login_latencies, 0.95):.0f} мс  max={max(login_latencies) * 1000:.0f} мс")
+    if health_latencies:
+        print(f"/health      p50={percentile(health_latencies, 0.5):.0f} мс  "
+              f"p95={percentile(health_latencies, 0.95):.0f} мс  "
+              f"mean={statistics.mean(health_latencies) * 1000:.0f} мс  max={max(health_latencies) * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочная проверка POST /auth/login")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))